@@ -1,10 +1,32 @@
 """
 App Package
 Main application modules
+
+Subpackages are imported lazily on first attribute access (PEP 562).
 """
 
-from . import api
-from . import schemas
-from . import middleware
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from . import api
+    from . import schemas
+    from . import middleware
+
+_SUBPACKAGES = ("api", "schemas", "middleware")
 
 __all__ = ["api", "schemas", "middleware"]
+
+
+def __getattr__(name):
+    """Import the ``name`` subpackage on first access"""
+    if name not in _SUBPACKAGES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = import_module(f".{name}", __name__)
+    globals()[name] = module
+    return module
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBPACKAGES))
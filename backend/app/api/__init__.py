@@ -3,6 +3,18 @@ API Package
 API routes and endpoints
 """
 
-from .endpoints import auth_router
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .endpoints import auth_router
 
 __all__ = ["auth_router"]
+
+
+def __getattr__(name):
+    """Re-export auth_router lazily so importing app.api loads no endpoint module"""
+    if name == "auth_router":
+        from .endpoints import auth_router
+        globals()[name] = auth_router
+        return auth_router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,24 +1,60 @@
 """
 API Endpoints Package
 Migration from Next.js API routes to FastAPI routers
+
+Routers are loaded lazily (PEP 562): importing this package does not import
+any endpoint module until its ``*_router`` attribute is first accessed.
+Submodules fetched as package attributes (``from app.api.endpoints import
+auth``) are wrapped in ``importlib.util.LazyLoader`` and only execute when
+one of their attributes is used.
+Set ``ENDPOINTS_EAGER_IMPORT=1`` (production workers) to load every router at
+import time instead, keeping import work off the first request.
 """
 
-from .auth import router as auth_router
-from .client import router as client_router
-from .admin import router as admin_router
-from .financial import router as financial_router
-from .trading import router as trading_router
-from .market import router as market_router
-from .portfolio import router as portfolio_router
-from .compliance import router as compliance_router
-from .risk_management import router as risk_management_router
-from .staff_referrals import router as staff_referrals_router
-from .users import router as users_router
-from .advanced_trading import router as advanced_trading_router
-
-__all__ = [
+import os
+import sys
+import importlib.util
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .auth import router as auth_router
+    from .client import router as client_router
+    from .admin import router as admin_router
+    from .financial import router as financial_router
+    from .trading import router as trading_router
+    from .market import router as market_router
+    from .portfolio import router as portfolio_router
+    from .compliance import router as compliance_router
+    from .risk_management import router as risk_management_router
+    from .staff_referrals import router as staff_referrals_router
+    from .users import router as users_router
+    from .advanced_trading import router as advanced_trading_router
+
+# Router registry: (attribute name, endpoint submodule, URL prefix, OpenAPI tags)
+# Order matches the order routers are mounted on the application.
+ROUTERS = (
+    ("auth_router",             "auth",             "/api/auth",            ("authentication",)),
+    ("client_router",           "client",           "/api/client",          ("client",)),
+    ("admin_router",            "admin",            "/api/admin",           ("admin",)),
+    ("financial_router",        "financial",        "/api/financial",       ("financial",)),
+    ("trading_router",          "trading",          "/api/trading",         ("trading",)),
+    ("market_router",           "market",           "/api/market",          ("market",)),
+    ("portfolio_router",        "portfolio",        "/api/portfolio",       ("portfolio",)),
+    ("compliance_router",       "compliance",       "/api/compliance",      ("compliance",)),
+    ("risk_management_router",  "risk_management",  "/api/risk-management", ("risk-management",)),
+    ("staff_referrals_router",  "staff_referrals",  "/api/staff",           ("staff",)),
+    ("users_router",            "users",            "/api",                 ("users",)),
+    ("advanced_trading_router", "advanced_trading", "/api",                 ("advanced-trading",)),
+)
+
+# Router attribute name -> endpoint submodule
+_ROUTER_MODULES = {attr: module_name for attr, module_name, _, _ in ROUTERS}
+_SUBMODULES = frozenset(_ROUTER_MODULES.values())
+
+__all__ = (
     "auth_router",
-    "client_router", 
+    "client_router",
     "admin_router",
     "financial_router",
     "trading_router",
@@ -28,5 +64,65 @@ __all__ = [
     "risk_management_router",
     "staff_referrals_router",
     "users_router",
-    "advanced_trading_router"
-]
+    "advanced_trading_router",
+    "ROUTERS",
+    "register_all",
+)
+
+
+def _cached_import(module_path, attr):
+    """Fetch ``attr`` from ``module_path``, skipping the import machinery when already loaded"""
+    module = sys.modules.get(module_path)
+    if module is None:
+        module = import_module(module_path)
+    return getattr(module, attr)
+
+
+def _lazy_submodule(module_name):
+    """Register ``module_name`` in sys.modules without executing it until first use"""
+    full_name = f"{__name__}.{module_name}"
+    module = sys.modules.get(full_name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(full_name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[full_name] = module
+    loader.exec_module(module)
+    return module
+
+
+def __getattr__(name):
+    """Import the endpoint module backing ``name`` on first access"""
+    if name in _SUBMODULES:
+        module = _lazy_submodule(name)
+        globals()[name] = module
+        return module
+
+    module_name = _ROUTER_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    router = _cached_import(f"{__name__}.{module_name}", "router")
+    # Cache on the package so later lookups bypass __getattr__
+    globals()[name] = router
+    return router
+
+
+def register_all(app):
+    """Mount every router in ``ROUTERS`` on ``app`` with its prefix and tags"""
+    namespace = globals()
+    for attr, _, prefix, tags in ROUTERS:
+        router = namespace[attr] if attr in namespace else __getattr__(attr)
+        app.include_router(router, prefix=prefix, tags=list(tags))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ROUTER_MODULES))
+
+
+if os.environ.get("ENDPOINTS_EAGER_IMPORT", "").lower() in ("1", "true", "yes"):
+    for _name in _ROUTER_MODULES:
+        __getattr__(_name)
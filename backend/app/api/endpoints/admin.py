@@ -3,11 +3,18 @@ Admin Endpoints - Migration từ Next.js API
 Bao gồm: users, customers, deposits, platform stats, referrals, subaccounts, trading adjustments, user performance
 """
 
-from fastapi import APIRouter, Depends, Request, HTTPException, status, Query, Path
-from typing import Optional, Dict, Any, List
+from fastapi import APIRouter, Body, Depends, Request, HTTPException, status, Query, Path
+from fastapi.responses import ORJSONResponse, Response
+from typing import Optional, Dict, Any, List, Tuple
 import asyncio
+import logging
+from collections import defaultdict
 from datetime import datetime, timedelta
 from enum import Enum
+from operator import attrgetter
+import orjson
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
 
 # Import schemas
 from ...schemas.admin import (
@@ -64,14 +71,165 @@ from ...schemas.admin import (
 
 # Import middleware functions
 from ...middleware.auth import (
-    verify_token,
-    TokenValidationError,
     get_client_ip,
     rate_limit,
-    require_admin_role
+    require_admin
 )
 
-router = APIRouter(tags=["admin"])
+logger = logging.getLogger(__name__)
+
+# Platform stats are aggregates with loose freshness requirements
+_PLATFORM_STATS_CACHE_KEY = "admin:platform:stats"
+_PLATFORM_STATS_CACHE_TTL = 30  # seconds
+
+router = APIRouter(tags=["admin"], default_response_class=ORJSONResponse)
+
+def _nullable_key(field: str, default: Any):
+    """Sort key for an Optional field: None sorts as ``default`` instead of raising TypeError"""
+    get = attrgetter(field)
+
+    def key(item):
+        value = get(item)
+        return default if value is None else value
+
+    return key
+
+
+# Sort keys accepted by the sortBy query parameter. Required fields use a
+# bare attrgetter; Optional ones map None to the type's minimum.
+_USER_SORT_KEYS = {
+    **{field: attrgetter(field) for field in ("id", "email", "role", "status", "kycStatus", "createdAt")},
+    "displayName": _nullable_key("displayName", ""),
+    "lastLoginAt": _nullable_key("lastLoginAt", datetime.min),
+    "updatedAt": _nullable_key("updatedAt", datetime.min),
+}
+_CUSTOMER_SORT_KEYS = {
+    **{field: attrgetter(field) for field in (
+        "id", "email", "registrationDate", "totalDeposits", "totalWithdrawals", "kycStatus"
+    )},
+    "displayName": _nullable_key("displayName", ""),
+    "lastActivity": _nullable_key("lastActivity", datetime.min),
+}
+
+# Serialize a whole page in one pydantic-core call instead of one model_dump per row
+_USER_LIST_ADAPTER = TypeAdapter(List[AdminUser])
+_CUSTOMER_LIST_ADAPTER = TypeAdapter(List[AdminCustomer])
+
+def _paginate(items: List[Any], page: int, limit: int) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Cắt một trang từ danh sách đã lọc/sắp xếp và tạo pagination info
+    TODO: When wired to the database, use AdminService.list_users, which
+    returns the page and the total (COUNT(*) OVER()) from a single query.
+    """
+    total = len(items)
+    start_index = (page - 1) * limit
+    pagination = {
+        "page": page,
+        "limit": limit,
+        "total": total,
+        "totalPages": (total + limit - 1) // limit if total else 0
+    }
+    return items[start_index:start_index + limit], pagination
+
+
+# ========== MOCK DATA ==========
+# TODO: Replace with actual database queries
+# Built once at import so handlers do not re-validate the fixtures per request
+
+_MOCK_NOW = datetime.now()
+
+_MOCK_USERS = (
+    AdminUser(
+        id="user_001",
+        email="user1@example.com",
+        displayName="Nguyễn Văn A",
+        role=UserRole.USER,
+        status=UserStatus.ACTIVE,
+        kycStatus=KYCStatus.VERIFIED,
+        isActive=True,
+        phoneNumber="+84123456789",
+        emailVerified=True,
+        phoneVerified=True,
+        balance={"usdt": 1000.50, "btc": 0.05, "eth": 0.1},
+        lastLoginAt=_MOCK_NOW - timedelta(hours=2),
+        createdAt=_MOCK_NOW - timedelta(days=30),
+        updatedAt=_MOCK_NOW - timedelta(days=1)
+    ),
+    AdminUser(
+        id="user_002",
+        email="user2@example.com",
+        displayName="Trần Thị B",
+        role=UserRole.USER,
+        status=UserStatus.ACTIVE,
+        kycStatus=KYCStatus.PENDING,
+        isActive=True,
+        phoneNumber="+84987654321",
+        emailVerified=True,
+        phoneVerified=False,
+        balance={"usdt": 500.25, "btc": 0.02},
+        lastLoginAt=_MOCK_NOW - timedelta(days=1),
+        createdAt=_MOCK_NOW - timedelta(days=15),
+        updatedAt=_MOCK_NOW - timedelta(days=2)
+    ),
+    AdminUser(
+        id="admin_001",
+        email="admin@example.com",
+        displayName="Quản trị viên",
+        role=UserRole.ADMIN,
+        status=UserStatus.ACTIVE,
+        kycStatus=KYCStatus.VERIFIED,
+        isActive=True,
+        phoneNumber="+85512345678",
+        emailVerified=True,
+        phoneVerified=True,
+        balance={"usdt": 0, "btc": 0, "eth": 0},
+        lastLoginAt=_MOCK_NOW,
+        createdAt=_MOCK_NOW - timedelta(days=60),
+        updatedAt=_MOCK_NOW - timedelta(hours=1)
+    )
+)
+
+_MOCK_CUSTOMERS = (
+    AdminCustomer(
+        id="cust_001",
+        userId="user_001",
+        email="customer1@example.com",
+        displayName="Nguyễn Văn Khách hàng",
+        phoneNumber="+84123456789",
+        totalDeposits=5000.00,
+        totalWithdrawals=1000.00,
+        kycStatus=KYCStatus.VERIFIED,
+        isActive=True,
+        referralSource="staff_001",
+        lastActivity=_MOCK_NOW - timedelta(hours=2)
+    ),
+    AdminCustomer(
+        id="cust_002",
+        userId="user_002",
+        email="customer2@example.com",
+        displayName="Trần Thị Khách hàng",
+        phoneNumber="+84987654321",
+        totalDeposits=2000.00,
+        totalWithdrawals=500.00,
+        kycStatus=KYCStatus.PENDING,
+        isActive=True,
+        referralSource="staff_002",
+        lastActivity=_MOCK_NOW - timedelta(days=1)
+    )
+)
+
+# Fields of UpdateUserRequest reported back in updatedFields, in response order
+_UPDATE_FIELDS = ("role", "status", "kycStatus", "isActive", "balance")
+
+# IDs accepted by update/delete user
+_KNOWN_USER_IDS = frozenset(user.id for user in _MOCK_USERS)
+
+# Users indexed by role (the in-memory analog of a SQL index on users.role)
+_USERS_BY_ROLE: Dict[UserRole, List[AdminUser]] = defaultdict(list)
+for _user in _MOCK_USERS:
+    _USERS_BY_ROLE[_user.role].append(_user)
+del _user
+
 
 # ========== ADMIN USER MANAGEMENT ENDPOINTS ==========
 
@@ -86,15 +244,15 @@ router = APIRouter(tags=["admin"])
     }
 )
 async def get_users(
-    request: Request,
     page: int = Query(1, ge=1, description="Trang hiện tại"),
     limit: int = Query(20, ge=1, le=100, description="Số lượng mỗi trang"),
     search: Optional[str] = Query(None, description="Tìm kiếm theo email"),
     role: Optional[UserRole] = Query(None, description="Lọc theo role"),
-    status: Optional[UserStatus] = Query(None, description="Lọc theo status"),
+    user_status: Optional[UserStatus] = Query(None, alias="status", description="Lọc theo status"),
     kyc_status: Optional[KYCStatus] = Query(None, alias="kycStatus", description="Lọc theo KYC status"),
     sort_by: str = Query("createdAt", alias="sortBy", description="Sắp xếp theo"),
-    sort_order: str = Query("desc", alias="sortOrder", description="Thứ tự sắp xếp")
+    sort_order: str = Query("desc", alias="sortOrder", description="Thứ tự sắp xếp"),
+    decoded_token: Dict[str, Any] = Depends(require_admin)
 ):
     """
     Lấy danh sách users - tương tự Next.js GET /api/admin/users
@@ -102,143 +260,51 @@ async def get_users(
     """
     
     try:
-        # Verify authentication and admin role
-        auth_header = request.headers.get("authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Không tìm thấy token xác thực"
-            )
-
-        token = auth_header.split(" ")[1]
-        decoded_token = verify_token(token)
-        
-        # Check admin role
-        if not require_admin_role(decoded_token):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Cần quyền admin để truy cập"
-            )
-
         # TODO: Replace with actual database query
         # Simulate database query with filtering and pagination
-        all_users = [
-            AdminUser(
-                id="user_001",
-                email="user1@example.com",
-                displayName="Nguyễn Văn A",
-                role=UserRole.USER,
-                status=UserStatus.ACTIVE,
-                kycStatus=KYCStatus.VERIFIED,
-                isActive=True,
-                phoneNumber="+84123456789",
-                emailVerified=True,
-                phoneVerified=True,
-                balance={"usdt": 1000.50, "btc": 0.05, "eth": 0.1},
-                lastLoginAt=datetime.now() - timedelta(hours=2),
-                createdAt=datetime.now() - timedelta(days=30),
-                updatedAt=datetime.now() - timedelta(days=1)
-            ),
-            AdminUser(
-                id="user_002",
-                email="user2@example.com",
-                displayName="Trần Thị B",
-                role=UserRole.USER,
-                status=UserStatus.ACTIVE,
-                kycStatus=KYCStatus.PENDING,
-                isActive=True,
-                phoneNumber="+84987654321",
-                emailVerified=True,
-                phoneVerified=False,
-                balance={"usdt": 500.25, "btc": 0.02},
-                lastLoginAt=datetime.now() - timedelta(days=1),
-                createdAt=datetime.now() - timedelta(days=15),
-                updatedAt=datetime.now() - timedelta(days=2)
-            ),
-            AdminUser(
-                id="admin_001",
-                email="admin@example.com",
-                displayName="Quản trị viên",
-                role=UserRole.ADMIN,
-                status=UserStatus.ACTIVE,
-                kycStatus=KYCStatus.VERIFIED,
-                isActive=True,
-                phoneNumber="+85512345678",
-                emailVerified=True,
-                phoneVerified=True,
-                balance={"usdt": 0, "btc": 0, "eth": 0},
-                lastLoginAt=datetime.now(),
-                createdAt=datetime.now() - timedelta(days=60),
-                updatedAt=datetime.now() - timedelta(hours=1)
-            )
-        ]
-
-        # Apply filters
-        filtered_users = all_users
-        
-        if search:
-            filtered_users = [u for u in filtered_users if search.lower() in u.email.lower()]
-        
-        if role:
-            filtered_users = [u for u in filtered_users if u.role == role]
-        
-        if status:
-            filtered_users = [u for u in filtered_users if u.status == status]
-        
-        if kyc_status:
-            filtered_users = [u for u in filtered_users if u.kyc_status == kyc_status]
-
-        # Sort users
-        reverse_sort = sort_order.lower() == "desc"
-        if sort_by in ["email", "displayName"]:
-            filtered_users.sort(key=lambda x: getattr(x, sort_by, "") or "", reverse=reverse_sort)
+        if role and not (search or user_status or kyc_status):
+            # Role-only filter: read straight from the role index.
+            # .get() avoids inserting empty lists into the defaultdict.
+            filtered_users = list(_USERS_BY_ROLE.get(role, ()))
         else:
-            filtered_users.sort(key=lambda x: getattr(x, sort_by, datetime.min), reverse=reverse_sort)
+            search_lower = search.lower() if search else None
+            filtered_users = [
+                u for u in _MOCK_USERS
+                if (not search_lower or search_lower in u.email.lower())
+                and (not role or u.role == role)
+                and (not user_status or u.status == user_status)
+                and (not kyc_status or u.kycStatus == kyc_status)
+            ]
+
+        # Sort users in place (unknown sort fields keep the query order).
+        # filtered_users is always a fresh list, so neither the source data
+        # nor the role index is ever reordered.
+        sort_key = _USER_SORT_KEYS.get(sort_by)
+        if sort_key is not None:
+            filtered_users.sort(key=sort_key, reverse=sort_order.lower() == "desc")
 
         # Apply pagination
-        start_index = (page - 1) * limit
-        end_index = start_index + limit
-        paginated_users = filtered_users[start_index:end_index]
-
-        # Convert to dict format (matching Next.js response)
-        users_data = []
-        for user in paginated_users:
-            user_dict = user.dict()
-            user_dict["createdAt"] = user.createdAt.isoformat()
-            user_dict["updatedAt"] = user.updatedAt.isoformat() if user.updatedAt else None
-            user_dict["lastLoginAt"] = user.lastLoginAt.isoformat() if user.lastLoginAt else None
-            users_data.append(user_dict)
-
-        # Calculate pagination info
-        total_users = len(filtered_users)
-        total_pages = (total_users + limit - 1) // limit
+        paginated_users, pagination = _paginate(filtered_users, page, limit)
+
+        # Convert to dict format (matching Next.js response);
+        # mode="json" emits ISO 8601 datetimes and enum values in pydantic-core
+        users_data = _USER_LIST_ADAPTER.dump_python(paginated_users, mode="json")
 
         response_data = {
             "users": users_data,
-            "pagination": {
-                "page": page,
-                "limit": limit,
-                "total": total_users,
-                "totalPages": total_pages
-            }
+            "pagination": pagination
         }
 
-        return UsersResponse(
-            success=True,
-            data=response_data
-        )
+        return ORJSONResponse({
+            "success": True,
+            "data": response_data
+        })
 
-    except TokenValidationError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token không hợp lệ"
-        )
-    
     except HTTPException:
         raise
     
-    except Exception as e:
-        print(f"Get users error: {e}")
+    except Exception:
+        logger.exception("Get users error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Không thể lấy danh sách người dùng"
@@ -258,9 +324,9 @@ async def get_users(
     }
 )
 async def update_user(
-    request: Request,
     user_id: str = Path(..., description="User ID"),
-    update_data: UpdateUserRequest = None
+    update_data: UpdateUserRequest = Body(...),
+    decoded_token: Dict[str, Any] = Depends(require_admin)
 ):
     """
     Cập nhật thông tin user - tương tự Next.js PUT /api/admin/users/:userId
@@ -268,30 +334,6 @@ async def update_user(
     """
     
     try:
-        # Verify authentication and admin role
-        auth_header = request.headers.get("authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Không tìm thấy token xác thực"
-            )
-
-        token = auth_header.split(" ")[1]
-        decoded_token = verify_token(token)
-        
-        # Check admin role
-        if not require_admin_role(decoded_token):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Cần quyền admin để truy cập"
-            )
-
-        # For PUT requests with body
-        if request.method == "PUT":
-            if not update_data:
-                update_data = await request.json()
-                update_data = UpdateUserRequest(**update_data)
-
         # TODO: Check if user exists in database
         # user_doc = await get_user_from_database(user_id)
         # if not user_doc:
@@ -301,7 +343,7 @@ async def update_user(
         #     )
 
         # Simulate user not found for invalid IDs
-        if user_id not in ["user_001", "user_002", "admin_001"]:
+        if user_id not in _KNOWN_USER_IDS:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Không tìm thấy người dùng"
@@ -324,38 +366,24 @@ async def update_user(
             pass
 
         # Determine which fields were updated
-        updated_fields = []
-        if update_data.role is not None:
-            updated_fields.append("role")
-        if update_data.status is not None:
-            updated_fields.append("status")
-        if update_data.kycStatus is not None:
-            updated_fields.append("kycStatus")
-        if update_data.isActive is not None:
-            updated_fields.append("isActive")
-        if update_data.balance is not None:
-            updated_fields.append("balance")
+        updated_fields = [
+            field for field in _UPDATE_FIELDS
+            if getattr(update_data, field) is not None
+        ]
 
         return UserResponse(
             success=True,
             message="Cập nhật thông tin người dùng thành công",
             data={
                 "updatedFields": updated_fields
-            },
-            updatedFields=updated_fields
+            }
         )
 
-    except TokenValidationError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token không hợp lệ"
-        )
-    
     except HTTPException:
         raise
     
-    except Exception as e:
-        print(f"Update user error: {e}")
+    except Exception:
+        logger.exception("Update user error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Không thể cập nhật thông tin người dùng"
@@ -375,8 +403,8 @@ async def update_user(
     }
 )
 async def delete_user(
-    request: Request,
-    user_id: str = Path(..., description="User ID")
+    user_id: str = Path(..., description="User ID"),
+    decoded_token: Dict[str, Any] = Depends(require_admin)
 ):
     """
     Xóa user (soft delete) - tương tự Next.js DELETE /api/admin/users/:userId
@@ -384,24 +412,6 @@ async def delete_user(
     """
     
     try:
-        # Verify authentication and admin role
-        auth_header = request.headers.get("authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Không tìm thấy token xác thực"
-            )
-
-        token = auth_header.split(" ")[1]
-        decoded_token = verify_token(token)
-        
-        # Check admin role
-        if not require_admin_role(decoded_token):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Cần quyền admin để truy cập"
-            )
-
         # TODO: Check if user exists
         # user_doc = await get_user_from_database(user_id)
         # if not user_doc:
@@ -411,7 +421,7 @@ async def delete_user(
         #     )
 
         # Simulate user not found for invalid IDs
-        if user_id not in ["user_001", "user_002", "admin_001"]:
+        if user_id not in _KNOWN_USER_IDS:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Không tìm thấy người dùng"
@@ -441,17 +451,11 @@ async def delete_user(
             message="Đã xóa người dùng thành công"
         )
 
-    except TokenValidationError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token không hợp lệ"
-        )
-    
     except HTTPException:
         raise
     
-    except Exception as e:
-        print(f"Delete user error: {e}")
+    except Exception:
+        logger.exception("Delete user error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Không thể xóa người dùng"
@@ -470,108 +474,52 @@ async def delete_user(
     }
 )
 async def get_customers(
-    request: Request,
     page: int = Query(1, ge=1, description="Trang hiện tại"),
     limit: int = Query(20, ge=1, le=100, description="Số lượng mỗi trang"),
     search: Optional[str] = Query(None, description="Tìm kiếm theo email hoặc tên"),
     kyc_status: Optional[KYCStatus] = Query(None, alias="kycStatus", description="Lọc theo KYC status"),
     is_active: Optional[bool] = Query(None, alias="isActive", description="Lọc theo trạng thái hoạt động"),
     sort_by: str = Query("registrationDate", alias="sortBy", description="Sắp xếp theo"),
-    sort_order: str = Query("desc", alias="sortOrder", description="Thứ tự sắp xếp")
+    sort_order: str = Query("desc", alias="sortOrder", description="Thứ tự sắp xếp"),
+    decoded_token: Dict[str, Any] = Depends(require_admin)
 ):
     """
     Lấy danh sách customers - tương tự Next.js GET /api/admin/customers
     """
     
     try:
-        # Verify authentication and admin role
-        auth_header = request.headers.get("authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Không tìm thấy token xác thực"
-            )
-
-        token = auth_header.split(" ")[1]
-        decoded_token = verify_token(token)
-        
-        if not require_admin_role(decoded_token):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Cần quyền admin để truy cập"
-            )
-
         # TODO: Replace with actual database query
-        all_customers = [
-            AdminCustomer(
-                id="cust_001",
-                userId="user_001",
-                email="customer1@example.com",
-                displayName="Nguyễn Văn Khách hàng",
-                phoneNumber="+84123456789",
-                totalDeposits=5000.00,
-                totalWithdrawals=1000.00,
-                kycStatus=KYCStatus.VERIFIED,
-                isActive=True,
-                referralSource="staff_001",
-                lastActivity=datetime.now() - timedelta(hours=2)
-            ),
-            AdminCustomer(
-                id="cust_002",
-                userId="user_002",
-                email="customer2@example.com",
-                displayName="Trần Thị Khách hàng",
-                phoneNumber="+84987654321",
-                totalDeposits=2000.00,
-                totalWithdrawals=500.00,
-                kycStatus=KYCStatus.PENDING,
-                isActive=True,
-                referralSource="staff_002",
-                lastActivity=datetime.now() - timedelta(days=1)
+        # Simulate filtering in a single pass (similar to users endpoint)
+        search_lower = search.lower() if search else None
+        filtered_customers = [
+            c for c in _MOCK_CUSTOMERS
+            if (
+                not search_lower
+                or search_lower in c.email.lower()
+                or (c.displayName and search_lower in c.displayName.lower())
             )
+            and (not kyc_status or c.kycStatus == kyc_status)
+            and (is_active is None or c.isActive == is_active)
         ]
 
-        # Apply filters (similar to users endpoint)
-        filtered_customers = all_customers
-        
-        if search:
-            filtered_customers = [
-                c for c in filtered_customers 
-                if search.lower() in c.email.lower() or 
-                   (c.displayName and search.lower() in c.displayName.lower())
-            ]
-        
-        if kyc_status:
-            filtered_customers = [c for c in filtered_customers if c.kycStatus == kyc_status]
-        
-        if is_active is not None:
-            filtered_customers = [c for c in filtered_customers if c.isActive == is_active]
+        # Sort customers (same logic as users)
+        sort_key = _CUSTOMER_SORT_KEYS.get(sort_by)
+        if sort_key is not None:
+            filtered_customers.sort(key=sort_key, reverse=sort_order.lower() == "desc")
 
-        # Sort and paginate (same logic as users)
-        # ... (sorting and pagination logic similar to users endpoint)
+        paginated_customers, pagination = _paginate(filtered_customers, page, limit)
 
-        return CustomersResponse(
-            success=True,
-            data=filtered_customers[:limit],  # Simplified for demo
-            pagination={
-                "page": page,
-                "limit": limit,
-                "total": len(filtered_customers),
-                "totalPages": (len(filtered_customers) + limit - 1) // limit
-            }
-        )
+        return ORJSONResponse({
+            "success": True,
+            "data": _CUSTOMER_LIST_ADAPTER.dump_python(paginated_customers, mode="json"),
+            "pagination": pagination
+        })
 
-    except TokenValidationError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token không hợp lệ"
-        )
-    
     except HTTPException:
         raise
     
-    except Exception as e:
-        print(f"Get customers error: {e}")
+    except Exception:
+        logger.exception("Get customers error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Không thể lấy danh sách khách hàng"
@@ -589,29 +537,27 @@ async def get_customers(
         403: {"model": AdminErrorResponse, "description": "Cần quyền admin"}
     }
 )
-async def get_platform_stats(request: Request):
+async def get_platform_stats(
+    request: Request,
+    decoded_token: Dict[str, Any] = Depends(require_admin)
+):
     """
     Lấy thống kê tổng quan platform - tương tự Next.js GET /api/admin/platform/stats
+    Response được cache trong Redis (app.state.redis) với TTL ngắn
     """
     
-    try:
-        # Verify authentication and admin role
-        auth_header = request.headers.get("authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Không tìm thấy token xác thực"
-            )
-
-        token = auth_header.split(" ")[1]
-        decoded_token = verify_token(token)
-        
-        if not require_admin_role(decoded_token):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Cần quyền admin để truy cập"
-            )
+    redis_client = getattr(request.app.state, "redis", None)
+    if redis_client is not None:
+        try:
+            cached = await redis_client.get(_PLATFORM_STATS_CACHE_KEY)
+        except RedisError:
+            logger.warning("Platform stats cache read failed", exc_info=True)
+            cached = None
+        if cached is not None:
+            # Cached body is already serialized JSON - return the bytes as-is
+            return Response(content=cached, media_type="application/json")
 
+    try:
         # TODO: Replace with actual database aggregation queries
         stats_data = PlatformStats(
             totalUsers=15847,
@@ -628,27 +574,28 @@ async def get_platform_stats(request: Request):
             transactionVolume=4700000.75
         )
 
-        return PlatformStatsResponse(
-            success=True,
-            data=stats_data
+        body = orjson.dumps(
+            PlatformStatsResponse(success=True, data=stats_data).model_dump(mode="json")
         )
 
-    except TokenValidationError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token không hợp lệ"
-        )
-    
     except HTTPException:
         raise
     
-    except Exception as e:
-        print(f"Get platform stats error: {e}")
+    except Exception:
+        logger.exception("Get platform stats error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Không thể lấy thống kê platform"
         )
 
+    if redis_client is not None:
+        try:
+            await redis_client.setex(_PLATFORM_STATS_CACHE_KEY, _PLATFORM_STATS_CACHE_TTL, body)
+        except RedisError:
+            logger.warning("Platform stats cache write failed", exc_info=True)
+
+    return Response(content=body, media_type="application/json")
+
 
 # ========== ADMIN DEPOSIT DETAIL ENDPOINT ==========
 
@@ -663,31 +610,14 @@ async def get_platform_stats(request: Request):
     }
 )
 async def get_deposit_detail(
-    request: Request,
-    deposit_id: str = Path(..., description="Deposit ID")
+    deposit_id: str = Path(..., description="Deposit ID"),
+    decoded_token: Dict[str, Any] = Depends(require_admin)
 ):
     """
     Lấy chi tiết deposit - tương tự Next.js GET /api/admin/deposits/[depositId]
     """
     
     try:
-        # Verify authentication and admin role
-        auth_header = request.headers.get("authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Không tìm thấy token xác thực"
-            )
-
-        token = auth_header.split(" ")[1]
-        decoded_token = verify_token(token)
-        
-        if not require_admin_role(decoded_token):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Cần quyền admin để truy cập"
-            )
-
         # TODO: Replace with actual database query
         # deposit_doc = await get_deposit_from_database(deposit_id)
         # if not deposit_doc:
@@ -724,17 +654,11 @@ async def get_deposit_detail(
             data=deposit_data
         )
 
-    except TokenValidationError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token không hợp lệ"
-        )
-    
     except HTTPException:
         raise
     
-    except Exception as e:
-        print(f"Get deposit detail error: {e}")
+    except Exception:
+        logger.exception("Get deposit detail error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Không thể lấy chi tiết giao dịch nạp tiền"
@@ -754,31 +678,14 @@ async def get_deposit_detail(
     }
 )
 async def get_user_performance(
-    request: Request,
-    user_id: str = Path(..., description="User ID")
+    user_id: str = Path(..., description="User ID"),
+    decoded_token: Dict[str, Any] = Depends(require_admin)
 ):
     """
     Lấy thống kê hiệu suất user - tương tự Next.js GET /api/admin/users/[userId]/performance
     """
     
     try:
-        # Verify authentication and admin role
-        auth_header = request.headers.get("authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Không tìm thấy token xác thực"
-            )
-
-        token = auth_header.split(" ")[1]
-        decoded_token = verify_token(token)
-        
-        if not require_admin_role(decoded_token):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Cần quyền admin để truy cập"
-            )
-
         # TODO: Replace with actual database aggregation
         performance_data = UserPerformance(
             userId=user_id,
@@ -801,17 +708,11 @@ async def get_user_performance(
             data=performance_data
         )
 
-    except TokenValidationError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token không hợp lệ"
-        )
-    
     except HTTPException:
         raise
     
-    except Exception as e:
-        print(f"Get user performance error: {e}")
+    except Exception:
+        logger.exception("Get user performance error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Không thể lấy thống kê hiệu suất người dùng"
@@ -4,9 +4,15 @@ Iceberg Orders, OCO Orders, và Trailing Stop Orders
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import List, Optional, Dict, Any, Union
-import uuid
+from typing import List, Optional, Dict, Any, Union, Tuple
+import logging
+import time
+from bisect import bisect_left, insort_left
+from collections import OrderedDict, defaultdict
+from itertools import count
 from datetime import datetime
 
 from app.schemas.advanced_trading import (
@@ -29,28 +35,211 @@ from app.schemas.advanced_trading import (
     CancelTrailingStopOrderRequest,
     OrderStatus,
     OrderSide,
+    TrailingType,
     get_mock_iceberg_orders,
     get_mock_oco_orders,
     get_mock_trailing_stop_orders,
     get_mock_current_price
 )
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(default_response_class=ORJSONResponse)
 security = HTTPBearer()
 
+class OrderStore:
+    """
+    In-memory order storage với index theo user
+    
+    - Primary: orderId -> order
+    - Index theo userId, (userId, symbol), (userId, status): list order
+      sắp xếp tăng dần theo createdAt, nên một trang mới nhất trước là một
+      lát cắt từ cuối list thay vì quét và sort toàn bộ orders
+    - Version theo userId: tăng mỗi lần orders của user thay đổi, dùng làm ETag
+      cho các list endpoint
+    """
+    
+    def __init__(self):
+        self._orders: Dict[str, Any] = {}
+        # orderId -> (createdAt, -insertion sequence): orders created at the same
+        # instant read back newest-first in insertion order, as a stable sort would
+        self._sort_keys: Dict[str, Tuple[datetime, int]] = {}
+        self._sequence = count()
+        self._by_user: Dict[str, list] = defaultdict(list)
+        self._by_user_symbol: Dict[Tuple[str, str], list] = defaultdict(list)
+        self._by_user_status: Dict[Tuple[str, OrderStatus], list] = defaultdict(list)
+        # Versions restart at 0 with the process; the epoch keeps old ETags from matching
+        self._epoch = time.time_ns()
+        self._versions: Dict[str, int] = defaultdict(int)
+    
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self._orders
+    
+    def __getitem__(self, order_id: str):
+        return self._orders[order_id]
+    
+    def __len__(self) -> int:
+        return len(self._orders)
+    
+    def add(self, order) -> None:
+        """Lưu order mới và cập nhật các index"""
+        self._orders[order.orderId] = order
+        self._sort_keys[order.orderId] = (order.createdAt, -next(self._sequence))
+        insort_left(self._by_user[order.userId], order, key=self._sort_key)
+        insort_left(self._by_user_symbol[(order.userId, order.symbol)], order, key=self._sort_key)
+        insort_left(self._by_user_status[(order.userId, order.status)], order, key=self._sort_key)
+        self._versions[order.userId] += 1
+    
+    def remove(self, order_id: str) -> None:
+        """Xóa order khỏi storage và các index"""
+        order = self._orders.pop(order_id)
+        self._discard(self._by_user, order.userId, order)
+        self._discard(self._by_user_symbol, (order.userId, order.symbol), order)
+        self._discard(self._by_user_status, (order.userId, order.status), order)
+        del self._sort_keys[order_id]
+        self._versions[order.userId] += 1
+    
+    def set_status(self, order, new_status: OrderStatus) -> None:
+        """Đổi status của order và chuyển order sang index status mới"""
+        self._discard(self._by_user_status, (order.userId, order.status), order)
+        order.status = new_status
+        insort_left(self._by_user_status[(order.userId, new_status)], order, key=self._sort_key)
+        self._versions[order.userId] += 1
+    
+    def touch(self, order) -> None:
+        """Đánh dấu order đã được sửa tại chỗ (đổi ETag của user)"""
+        self._versions[order.userId] += 1
+    
+    def etag(self, user_id: str, *query) -> str:
+        """Weak ETag cho một list query của user: đổi khi orders của user thay đổi"""
+        version = self._versions.get(user_id, 0)
+        return f'W/"{self._epoch:x}-{version:x}-{hash((user_id, query)) & 0xFFFFFFFFFFFFFFFF:x}"'
+    
+    def query(
+        self,
+        user_id: str,
+        symbol: Optional[str] = None,
+        status: Optional[OrderStatus] = None,
+        page: int = 1,
+        limit: int = 50
+    ) -> Tuple[list, int]:
+        """
+        Lấy một trang orders của user (mới nhất trước) và tổng số orders khớp filter
+        """
+        offset = (page - 1) * limit
+        if symbol and status:
+            # Walk the smaller index newest first, keep only the requested page
+            by_symbol = self._by_user_symbol.get((user_id, symbol), ())
+            by_status = self._by_user_status.get((user_id, status), ())
+            if len(by_symbol) <= len(by_status):
+                candidates, attr, value = by_symbol, "status", status
+            else:
+                candidates, attr, value = by_status, "symbol", symbol
+            page_orders = []
+            total = 0
+            for order in reversed(candidates):
+                if getattr(order, attr) == value:
+                    if offset <= total < offset + limit:
+                        page_orders.append(order)
+                    total += 1
+            return page_orders, total
+        
+        if symbol:
+            orders = self._by_user_symbol.get((user_id, symbol), ())
+        elif status:
+            orders = self._by_user_status.get((user_id, status), ())
+        else:
+            orders = self._by_user.get(user_id, ())
+        
+        total = len(orders)
+        end = total - offset
+        if end <= 0:
+            return [], total
+        return orders[max(end - limit, 0):end][::-1], total
+    
+    def _sort_key(self, order) -> Tuple[datetime, int]:
+        return self._sort_keys[order.orderId]
+    
+    def _discard(self, index: Dict[Any, list], key, order) -> None:
+        orders = index.get(key)
+        if not orders:
+            return
+        i = bisect_left(orders, self._sort_key(order), key=self._sort_key)
+        if i < len(orders) and orders[i] is order:
+            del orders[i]
+        if not orders:
+            del index[key]
+
+
 # In-memory storage cho development
-iceberg_orders_storage = {}
-oco_orders_storage = {}
-trailing_stop_orders_storage = {}
+iceberg_orders_storage = OrderStore()
+oco_orders_storage = OrderStore()
+trailing_stop_orders_storage = OrderStore()
+
+
+# Pages longer than this are dumped in the threadpool instead of on the event loop
+INLINE_DUMP_MAX_ORDERS = 20
+
+
+# Order payloads omit optional fields that are not set (price, maxSlices,
+# activationPrice) instead of sending them as null
+def _dump_orders(orders: list) -> List[Dict[str, Any]]:
+    return [order.model_dump(exclude_none=True) for order in orders]
+
+
+async def _dump_order_page(orders: list) -> List[Dict[str, Any]]:
+    """Dump một trang orders thành dict; trang lớn chạy trong threadpool"""
+    if len(orders) <= INLINE_DUMP_MAX_ORDERS:
+        return _dump_orders(orders)
+    return await run_in_threadpool(_dump_orders, orders)
+
+
+def _page_metadata(page: int, limit: int, total: int) -> Dict[str, Any]:
+    """Metadata (timestamp + pagination) cho các list endpoint"""
+    return {
+        "timestamp": datetime.utcnow(),
+        "pagination": {
+            "page": page,
+            "limit": limit,
+            "total": total,
+            "hasNext": page * limit < total,
+            "hasPrev": page > 1
+        }
+    }
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 response nếu If-None-Match của client khớp ETag hiện tại"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (tag.strip() for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
+
 
+# Order ID sequence: unique within the process, time prefix keeps IDs unique across restarts
+_id_sequence = count(1)
 
-async def verify_user_session(credentials: HTTPAuthorizationCredentials) -> dict:
+
+def _mkid(prefix: str) -> str:
+    """Tạo order ID dạng PREFIX_<time_ns hex>_<sequence hex>"""
+    return f"{prefix}_{time.time_ns():x}_{next(_id_sequence):x}"
+
+
+# Session cache: token -> (expires_at, session)
+# Polling clients send the same token many times per second; verify once per TTL
+SESSION_CACHE_TTL = 30  # seconds
+SESSION_CACHE_MAX_SIZE = 4096
+_session_cache: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+
+
+def _verify_token(token: str) -> dict:
     """
-    Verify user session từ token
+    Verify token và trả về user session
     Trong production sẽ verify JWT/Firebase token
     """
-    token = credentials.credentials
-    
     # Mock verification - trong production sẽ verify JWT/Firebase token
     if not token:
         raise HTTPException(
@@ -68,6 +257,29 @@ async def verify_user_session(credentials: HTTPAuthorizationCredentials) -> dict
     }
 
 
+async def verify_user_session(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """
+    Verify user session từ token, cache kết quả theo token trong SESSION_CACHE_TTL giây
+    """
+    token = credentials.credentials
+    now = time.monotonic()
+    
+    cached = _session_cache.get(token)
+    if cached and cached[0] > now:
+        _session_cache.move_to_end(token)
+        return dict(cached[1])
+    
+    session = _verify_token(token)
+    
+    # Cache the result, evicting least recently used tokens past the size bound
+    _session_cache[token] = (now + SESSION_CACHE_TTL, session)
+    _session_cache.move_to_end(token)
+    while len(_session_cache) > SESSION_CACHE_MAX_SIZE:
+        _session_cache.popitem(last=False)
+    
+    return dict(session)
+
+
 # ========== ICEBERG ORDERS ==========
 
 @router.post(
@@ -87,23 +299,25 @@ async def create_iceberg_order(
     
     Iceberg Order chia tổng số lượng thành nhiều slice nhỏ để tránh tác động lớn lên thị trường
     """
+    user_id = user_session["uid"]
+    now = datetime.utcnow()
+    
+    # Check user balance (simplified)
+    user_balance = 10000.0  # Mock balance
+    required_margin = create_request.totalQuantity * (create_request.price or 1000) * 0.1
+    
+    if user_balance < required_margin:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Số dư không đủ để tạo Iceberg Order"
+        )
+    
     try:
-        user_id = user_session["uid"]
-        
-        # Check user balance (simplified)
-        user_balance = 10000.0  # Mock balance
-        required_margin = create_request.totalQuantity * (create_request.price or 1000) * 0.1
-        
-        if user_balance < required_margin:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Số dư không đủ để tạo Iceberg Order"
-            )
-        
         # Create iceberg order
-        iceberg_order_id = f"ICEBERG_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+        iceberg_order_id = _mkid("ICEBERG")
         
-        iceberg_order = IcebergOrder(
+        # Values come from the validated request: build without re-validating
+        iceberg_order = IcebergOrder.model_construct(
             orderId=iceberg_order_id,
             userId=user_id,
             symbol=create_request.symbol,
@@ -113,33 +327,36 @@ async def create_iceberg_order(
             remainingQuantity=create_request.totalQuantity,
             price=create_request.price,
             timeInForce=create_request.timeInForce,
-            maxSlices=create_request.maxSlices
+            maxSlices=create_request.maxSlices,
+            createdAt=now,
+            updatedAt=now
         )
         
         # Store in memory
-        iceberg_orders_storage[iceberg_order_id] = iceberg_order
-        
-        # Log activity
-        print(f"Iceberg order created: {iceberg_order_id} for user {user_id}")
-        
-        return IcebergOrderResponse(
-            success=True,
-            data=iceberg_order,
-            metadata={
-                "timestamp": datetime.utcnow(),
-                "message": "Iceberg Order được tạo thành công"
-            }
-        )
-        
-    except HTTPException:
-        raise
+        iceberg_orders_storage.add(iceberg_order)
+        data = iceberg_order.model_dump(exclude_none=True)
     except Exception as error:
-        print("Create Iceberg Order Error:", error)
+        logger.exception("Create Iceberg Order error")
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi khi tạo Iceberg Order: {str(error)}"
         )
+    
+    # Log activity
+    logger.info("Iceberg order created: %s for user %s", iceberg_order_id, user_id)
+    
+    return ORJSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={
+            "success": True,
+            "data": data,
+            "metadata": {
+                "timestamp": now,
+                "message": "Iceberg Order được tạo thành công"
+            }
+        }
+    )
 
 
 @router.get(
@@ -160,52 +377,36 @@ async def get_iceberg_orders(
     """
     Lấy danh sách Iceberg Orders với pagination và filtering
     """
+    user_id = user_session["uid"]
+    
+    # Polling clients that already hold this page get a 304 without any work
+    etag = iceberg_orders_storage.etag(user_id, symbol, status_filter, page, limit)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
     try:
-        user_id = user_session["uid"]
-        
-        # Get all orders for user
-        user_orders = [
-            order for order in iceberg_orders_storage.values()
-            if order.userId == user_id
-        ]
-        
-        # Apply filters
-        if symbol:
-            user_orders = [order for order in user_orders if order.symbol == symbol]
-        
-        if status_filter:
-            user_orders = [order for order in user_orders if order.status == status_filter]
-        
-        # Sort by creation date (newest first)
-        user_orders.sort(key=lambda x: x.createdAt, reverse=True)
-        
-        # Apply pagination
-        total = len(user_orders)
-        offset = (page - 1) * limit
-        paginated_orders = user_orders[offset:offset + limit]
-        
-        return OrderListResponse(
-            success=True,
-            data=[order.dict() for order in paginated_orders],
-            metadata={
-                "timestamp": datetime.utcnow(),
-                "pagination": {
-                    "page": page,
-                    "limit": limit,
-                    "total": total,
-                    "hasNext": offset + limit < total,
-                    "hasPrev": page > 1
-                }
-            }
+        # Page of the user's orders, newest first, read from the store indexes
+        paginated_orders, total = iceberg_orders_storage.query(
+            user_id, symbol=symbol, status=status_filter, page=page, limit=limit
         )
-        
+        data = await _dump_order_page(paginated_orders)
     except Exception as error:
-        print("Get Iceberg Orders Error:", error)
+        logger.exception("Get Iceberg Orders error")
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi khi lấy danh sách Iceberg Orders: {str(error)}"
         )
+    
+    return ORJSONResponse(
+        content={
+            "success": True,
+            "data": data,
+            "metadata": _page_metadata(page, limit, total)
+        },
+        headers={"ETag": etag}
+    )
 
 
 @router.patch(
@@ -223,70 +424,72 @@ async def update_iceberg_order(
     """
     Cập nhật Iceberg Order (visible quantity, max slices)
     """
+    user_id = user_session["uid"]
+    now = datetime.utcnow()
+    
+    # Check if order exists and belongs to user
+    if update_request.orderId not in iceberg_orders_storage:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Iceberg Order không tồn tại"
+        )
+    
+    order = iceberg_orders_storage[update_request.orderId]
+    
+    if order.userId != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Không có quyền cập nhật order này"
+        )
+    
+    if order.status is not OrderStatus.PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Order không thể cập nhật (không còn PENDING)"
+        )
+    
+    # Validate every field before touching the order so a rejected update changes nothing
+    if update_request.visibleQuantity and update_request.visibleQuantity > order.remainingQuantity:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Visible quantity không thể vượt quá remaining quantity"
+        )
+    
+    if update_request.maxSlices and update_request.maxSlices <= order.executedSlices:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Max slices phải lớn hơn executed slices"
+        )
+    
     try:
-        user_id = user_session["uid"]
-        
-        # Check if order exists and belongs to user
-        if update_request.orderId not in iceberg_orders_storage:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Iceberg Order không tồn tại"
-            )
-        
-        order = iceberg_orders_storage[update_request.orderId]
-        
-        if order.userId != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Không có quyền cập nhật order này"
-            )
-        
-        if order.status != OrderStatus.PENDING:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Order không thể cập nhật (không còn PENDING)"
-            )
-        
         # Update fields
         if update_request.visibleQuantity:
-            if update_request.visibleQuantity > order.remainingQuantity:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Visible quantity không thể vượt quá remaining quantity"
-                )
             order.visibleQuantity = update_request.visibleQuantity
         
         if update_request.maxSlices:
-            if update_request.maxSlices <= order.executedSlices:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Max slices phải lớn hơn executed slices"
-                )
             order.maxSlices = update_request.maxSlices
         
-        order.updatedAt = datetime.utcnow()
-        
-        # Save updated order
-        iceberg_orders_storage[update_request.orderId] = order
-        
-        return IcebergOrderResponse(
-            success=True,
-            data=order,
-            metadata={
-                "timestamp": datetime.utcnow(),
-                "message": "Iceberg Order được cập nhật thành công"
-            }
-        )
-        
-    except HTTPException:
-        raise
+        order.updatedAt = now
+        iceberg_orders_storage.touch(order)
+        data = order.model_dump(exclude_none=True)
     except Exception as error:
-        print("Update Iceberg Order Error:", error)
+        logger.exception("Update Iceberg Order error")
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi khi cập nhật Iceberg Order: {str(error)}"
         )
+    
+    return ORJSONResponse(
+        content={
+            "success": True,
+            "data": data,
+            "metadata": {
+                "timestamp": now,
+                "message": "Iceberg Order được cập nhật thành công"
+            }
+        }
+    )
 
 
 # ========== OCO ORDERS ==========
@@ -309,76 +512,72 @@ async def create_oco_order(
     OCO order bao gồm take profit và stop loss orders.
     Khi một order được thực hiện, order kia sẽ tự động bị hủy.
     """
+    user_id = user_session["uid"]
+    now = datetime.utcnow()
+    
+    # Check user balance
+    user_balance = 10000.0  # Mock balance
+    take_profit_price = create_request.takeProfitPrice
+    stop_loss_price = create_request.stopLossPrice
+    # Margin on the higher of the two legs
+    higher_price = take_profit_price if take_profit_price > stop_loss_price else stop_loss_price
+    required_margin = create_request.quantity * higher_price * 0.1
+    
+    if user_balance < required_margin:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Số dư không đủ để tạo OCO Order"
+        )
+    
     try:
-        user_id = user_session["uid"]
-        
-        # Check user balance
-        user_balance = 10000.0  # Mock balance
-        required_margin = create_request.quantity * max(
-            create_request.takeProfitPrice, 
-            create_request.stopLossPrice
-        ) * 0.1
-        
-        if user_balance < required_margin:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Số dư không đủ để tạo OCO Order"
-            )
-        
         # Create OCO order
-        oco_order_id = f"OCO_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+        oco_order_id = _mkid("OCO")
         
         # Create take profit order
-        take_profit_order_id = f"TP_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+        take_profit_order_id = _mkid("TP")
         
         # Create stop loss order
-        stop_loss_order_id = f"SL_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+        stop_loss_order_id = _mkid("SL")
         
-        oco_order = OcoOrder(
+        # Values come from the validated request: build without re-validating
+        oco_order = OcoOrder.model_construct(
             orderId=oco_order_id,
             userId=user_id,
             symbol=create_request.symbol,
-            orders={
-                "takeProfit": {
-                    "orderId": take_profit_order_id,
-                    "side": create_request.side,
-                    "price": create_request.takeProfitPrice,
-                    "quantity": create_request.quantity,
-                    "status": OrderStatus.PENDING
-                },
-                "stopLoss": {
-                    "orderId": stop_loss_order_id,
-                    "side": create_request.side,
-                    "price": create_request.stopLossPrice,
-                    "quantity": create_request.quantity,
-                    "status": OrderStatus.PENDING
-                }
-            }
+            side=create_request.side,
+            quantity=create_request.quantity,
+            takeProfitOrderId=take_profit_order_id,
+            takeProfitPrice=take_profit_price,
+            stopLossOrderId=stop_loss_order_id,
+            stopLossPrice=stop_loss_price,
+            createdAt=now,
+            updatedAt=now
         )
         
         # Store in memory
-        oco_orders_storage[oco_order_id] = oco_order
-        
-        print(f"OCO order created: {oco_order_id} for user {user_id}")
-        
-        return OcoOrderResponse(
-            success=True,
-            data=oco_order,
-            metadata={
-                "timestamp": datetime.utcnow(),
-                "message": "OCO Order được tạo thành công"
-            }
-        )
-        
-    except HTTPException:
-        raise
+        oco_orders_storage.add(oco_order)
+        data = oco_order.model_dump(exclude_none=True)
     except Exception as error:
-        print("Create OCO Order Error:", error)
+        logger.exception("Create OCO Order error")
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi khi tạo OCO Order: {str(error)}"
         )
+    
+    logger.info("OCO order created: %s for user %s", oco_order_id, user_id)
+    
+    return ORJSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={
+            "success": True,
+            "data": data,
+            "metadata": {
+                "timestamp": now,
+                "message": "OCO Order được tạo thành công"
+            }
+        }
+    )
 
 
 @router.get(
@@ -399,52 +598,36 @@ async def get_oco_orders(
     """
     Lấy danh sách OCO Orders với pagination và filtering
     """
+    user_id = user_session["uid"]
+    
+    # Polling clients that already hold this page get a 304 without any work
+    etag = oco_orders_storage.etag(user_id, symbol, status_filter, page, limit)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
     try:
-        user_id = user_session["uid"]
-        
-        # Get all orders for user
-        user_orders = [
-            order for order in oco_orders_storage.values()
-            if order.userId == user_id
-        ]
-        
-        # Apply filters
-        if symbol:
-            user_orders = [order for order in user_orders if order.symbol == symbol]
-        
-        if status_filter:
-            user_orders = [order for order in user_orders if order.status == status_filter]
-        
-        # Sort by creation date
-        user_orders.sort(key=lambda x: x.createdAt, reverse=True)
-        
-        # Apply pagination
-        total = len(user_orders)
-        offset = (page - 1) * limit
-        paginated_orders = user_orders[offset:offset + limit]
-        
-        return OrderListResponse(
-            success=True,
-            data=[order.dict() for order in paginated_orders],
-            metadata={
-                "timestamp": datetime.utcnow(),
-                "pagination": {
-                    "page": page,
-                    "limit": limit,
-                    "total": total,
-                    "hasNext": offset + limit < total,
-                    "hasPrev": page > 1
-                }
-            }
+        # Page of the user's orders, newest first, read from the store indexes
+        paginated_orders, total = oco_orders_storage.query(
+            user_id, symbol=symbol, status=status_filter, page=page, limit=limit
         )
-        
+        data = await _dump_order_page(paginated_orders)
     except Exception as error:
-        print("Get OCO Orders Error:", error)
+        logger.exception("Get OCO Orders error")
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi khi lấy danh sách OCO Orders: {str(error)}"
         )
+    
+    return ORJSONResponse(
+        content={
+            "success": True,
+            "data": data,
+            "metadata": _page_metadata(page, limit, total)
+        },
+        headers={"ETag": etag}
+    )
 
 
 # ========== TRAILING STOP ORDERS ==========
@@ -466,52 +649,54 @@ async def create_trailing_stop_order(
     
     Trailing stop order tự động điều chỉnh stop price theo giá thị trường
     """
-    try:
-        user_id = user_session["uid"]
-        
-        # Get current market price
-        current_price = get_mock_current_price(create_request.symbol)
-        
-        if not current_price:
+    user_id = user_session["uid"]
+    now = datetime.utcnow()
+    
+    # Get current market price
+    current_price = get_mock_current_price(create_request.symbol)
+    
+    if not current_price:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Không thể lấy giá hiện tại cho symbol {create_request.symbol}"
+        )
+    
+    # Check activation price logic
+    if create_request.activationPrice:
+        if create_request.side is OrderSide.BUY and create_request.activationPrice > current_price:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Không thể lấy giá hiện tại cho symbol {create_request.symbol}"
+                detail="Activation price cho BUY order phải thấp hơn giá hiện tại"
             )
-        
-        # Check activation price logic
-        if create_request.activationPrice:
-            if create_request.side == OrderSide.BUY and create_request.activationPrice > current_price:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Activation price cho BUY order phải thấp hơn giá hiện tại"
-                )
-            elif create_request.side == OrderSide.SELL and create_request.activationPrice < current_price:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Activation price cho SELL order phải cao hơn giá hiện tại"
-                )
-        
-        # Check user balance
-        user_balance = 10000.0  # Mock balance
-        required_margin = current_price * create_request.quantity * 0.1
-        
-        if user_balance < required_margin:
+        elif create_request.side is OrderSide.SELL and create_request.activationPrice < current_price:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Số dư không đủ để tạo Trailing Stop Order"
+                detail="Activation price cho SELL order phải cao hơn giá hiện tại"
             )
-        
-        # Calculate initial stop price
-        if create_request.trailingType.value == "PERCENTAGE":
-            percentage = create_request.trailValue / 100
-            initial_stop_price = current_price * (1 - percentage) if create_request.side == OrderSide.BUY else current_price * (1 + percentage)
-        else:  # FIXED_AMOUNT
-            initial_stop_price = current_price - create_request.trailValue if create_request.side == OrderSide.BUY else current_price + create_request.trailValue
-        
+    
+    # Check user balance
+    user_balance = 10000.0  # Mock balance
+    required_margin = current_price * create_request.quantity * 0.1
+    
+    if user_balance < required_margin:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Số dư không đủ để tạo Trailing Stop Order"
+        )
+    
+    # Calculate initial stop price: below market for BUY, above for SELL
+    sign = -1.0 if create_request.side is OrderSide.BUY else 1.0
+    if create_request.trailingType is TrailingType.PERCENTAGE:
+        initial_stop_price = current_price * (1 + sign * create_request.trailValue / 100)
+    else:  # FIXED_AMOUNT
+        initial_stop_price = current_price + sign * create_request.trailValue
+    
+    try:
         # Create trailing stop order
-        trailing_stop_order_id = f"TRAILING_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+        trailing_stop_order_id = _mkid("TRAILING")
         
-        trailing_stop_order = TrailingStopOrder(
+        # Values come from the validated request: build without re-validating
+        trailing_stop_order = TrailingStopOrder.model_construct(
             orderId=trailing_stop_order_id,
             userId=user_id,
             symbol=create_request.symbol,
@@ -522,33 +707,36 @@ async def create_trailing_stop_order(
             currentTrailValue=create_request.trailValue,
             stopPrice=initial_stop_price,
             activationPrice=create_request.activationPrice,
-            timeInForce=create_request.timeInForce
+            timeInForce=create_request.timeInForce,
+            createdAt=now,
+            updatedAt=now
         )
         
         # Store in memory
-        trailing_stop_orders_storage[trailing_stop_order_id] = trailing_stop_order
-        
-        print(f"Trailing stop order created: {trailing_stop_order_id} for user {user_id}")
-        
-        return TrailingStopOrderResponse(
-            success=True,
-            data=trailing_stop_order,
-            metadata={
-                "timestamp": datetime.utcnow(),
-                "message": "Trailing Stop Order được tạo thành công",
-                "currentPrice": current_price
-            }
-        )
-        
-    except HTTPException:
-        raise
+        trailing_stop_orders_storage.add(trailing_stop_order)
+        data = trailing_stop_order.model_dump(exclude_none=True)
     except Exception as error:
-        print("Create Trailing Stop Order Error:", error)
+        logger.exception("Create Trailing Stop Order error")
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi khi tạo Trailing Stop Order: {str(error)}"
         )
+    
+    logger.info("Trailing stop order created: %s for user %s", trailing_stop_order_id, user_id)
+    
+    return ORJSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={
+            "success": True,
+            "data": data,
+            "metadata": {
+                "timestamp": now,
+                "message": "Trailing Stop Order được tạo thành công",
+                "currentPrice": current_price
+            }
+        }
+    )
 
 
 @router.get(
@@ -569,52 +757,36 @@ async def get_trailing_stop_orders(
     """
     Lấy danh sách Trailing Stop Orders với pagination và filtering
     """
+    user_id = user_session["uid"]
+    
+    # Polling clients that already hold this page get a 304 without any work
+    etag = trailing_stop_orders_storage.etag(user_id, symbol, status_filter, page, limit)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
     try:
-        user_id = user_session["uid"]
-        
-        # Get all orders for user
-        user_orders = [
-            order for order in trailing_stop_orders_storage.values()
-            if order.userId == user_id
-        ]
-        
-        # Apply filters
-        if symbol:
-            user_orders = [order for order in user_orders if order.symbol == symbol]
-        
-        if status_filter:
-            user_orders = [order for order in user_orders if order.status == status_filter]
-        
-        # Sort by creation date
-        user_orders.sort(key=lambda x: x.createdAt, reverse=True)
-        
-        # Apply pagination
-        total = len(user_orders)
-        offset = (page - 1) * limit
-        paginated_orders = user_orders[offset:offset + limit]
-        
-        return OrderListResponse(
-            success=True,
-            data=[order.dict() for order in paginated_orders],
-            metadata={
-                "timestamp": datetime.utcnow(),
-                "pagination": {
-                    "page": page,
-                    "limit": limit,
-                    "total": total,
-                    "hasNext": offset + limit < total,
-                    "hasPrev": page > 1
-                }
-            }
+        # Page of the user's orders, newest first, read from the store indexes
+        paginated_orders, total = trailing_stop_orders_storage.query(
+            user_id, symbol=symbol, status=status_filter, page=page, limit=limit
         )
-        
+        data = await _dump_order_page(paginated_orders)
     except Exception as error:
-        print("Get Trailing Stop Orders Error:", error)
+        logger.exception("Get Trailing Stop Orders error")
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi khi lấy danh sách Trailing Stop Orders: {str(error)}"
         )
+    
+    return ORJSONResponse(
+        content={
+            "success": True,
+            "data": data,
+            "metadata": _page_metadata(page, limit, total)
+        },
+        headers={"ETag": etag}
+    )
 
 
 @router.patch(
@@ -632,30 +804,31 @@ async def update_trailing_stop_order(
     """
     Cập nhật Trailing Stop Order (trail value, activation price, stop price)
     """
+    user_id = user_session["uid"]
+    now = datetime.utcnow()
+    
+    # Check if order exists and belongs to user
+    if update_request.orderId not in trailing_stop_orders_storage:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trailing Stop Order không tồn tại"
+        )
+    
+    order = trailing_stop_orders_storage[update_request.orderId]
+    
+    if order.userId != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Không có quyền cập nhật order này"
+        )
+    
+    if order.status is not OrderStatus.PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Order không thể cập nhật (không còn PENDING)"
+        )
+    
     try:
-        user_id = user_session["uid"]
-        
-        # Check if order exists and belongs to user
-        if update_request.orderId not in trailing_stop_orders_storage:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Trailing Stop Order không tồn tại"
-            )
-        
-        order = trailing_stop_orders_storage[update_request.orderId]
-        
-        if order.userId != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Không có quyền cập nhật order này"
-            )
-        
-        if order.status != OrderStatus.PENDING:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Order không thể cập nhật (không còn PENDING)"
-            )
-        
         # Update fields
         if update_request.trailValue:
             order.trailValue = update_request.trailValue
@@ -667,29 +840,27 @@ async def update_trailing_stop_order(
         if update_request.stopPrice:
             order.stopPrice = update_request.stopPrice
         
-        order.updatedAt = datetime.utcnow()
-        
-        # Save updated order
-        trailing_stop_orders_storage[update_request.orderId] = order
-        
-        return TrailingStopOrderResponse(
-            success=True,
-            data=order,
-            metadata={
-                "timestamp": datetime.utcnow(),
-                "message": "Trailing Stop Order được cập nhật thành công"
-            }
-        )
-        
-    except HTTPException:
-        raise
+        order.updatedAt = now
+        trailing_stop_orders_storage.touch(order)
+        data = order.model_dump(exclude_none=True)
     except Exception as error:
-        print("Update Trailing Stop Order Error:", error)
+        logger.exception("Update Trailing Stop Order error")
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi khi cập nhật Trailing Stop Order: {str(error)}"
         )
+    
+    return ORJSONResponse(
+        content={
+            "success": True,
+            "data": data,
+            "metadata": {
+                "timestamp": now,
+                "message": "Trailing Stop Order được cập nhật thành công"
+            }
+        }
+    )
 
 
 @router.delete(
@@ -707,52 +878,49 @@ async def cancel_trailing_stop_order(
     """
     Hủy Trailing Stop Order
     """
+    user_id = user_session["uid"]
+    now = datetime.utcnow()
+    
+    # Check if order exists and belongs to user
+    if cancel_request.orderId not in trailing_stop_orders_storage:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trailing Stop Order không tồn tại"
+        )
+    
+    order = trailing_stop_orders_storage[cancel_request.orderId]
+    
+    if order.userId != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Không có quyền hủy order này"
+        )
+    
+    if order.status is not OrderStatus.PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Order không thể hủy (không còn PENDING)"
+        )
+    
     try:
-        user_id = user_session["uid"]
-        
-        # Check if order exists and belongs to user
-        if cancel_request.orderId not in trailing_stop_orders_storage:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Trailing Stop Order không tồn tại"
-            )
-        
-        order = trailing_stop_orders_storage[cancel_request.orderId]
-        
-        if order.userId != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Không có quyền hủy order này"
-            )
-        
-        if order.status != OrderStatus.PENDING:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Order không thể hủy (không còn PENDING)"
-            )
-        
         # Update order status to cancelled
-        order.status = OrderStatus.CANCELLED
-        order.updatedAt = datetime.utcnow()
-        
-        # Save updated order
-        trailing_stop_orders_storage[cancel_request.orderId] = order
-        
-        return TrailingStopOrderResponse(
-            success=True,
-            data={"orderId": cancel_request.orderId, "status": OrderStatus.CANCELLED},
-            metadata={
-                "timestamp": datetime.utcnow(),
-                "message": "Trailing Stop Order đã được hủy thành công"
-            }
-        )
-        
-    except HTTPException:
-        raise
+        trailing_stop_orders_storage.set_status(order, OrderStatus.CANCELLED)
+        order.updatedAt = now
     except Exception as error:
-        print("Cancel Trailing Stop Order Error:", error)
+        logger.exception("Cancel Trailing Stop Order error")
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi khi hủy Trailing Stop Order: {str(error)}"
-        )
\ No newline at end of file
+        )
+    
+    return ORJSONResponse(
+        content={
+            "success": True,
+            "data": {"orderId": cancel_request.orderId, "status": OrderStatus.CANCELLED},
+            "metadata": {
+                "timestamp": now,
+                "message": "Trailing Stop Order đã được hủy thành công"
+            }
+        }
+    )
\ No newline at end of file
@@ -3,9 +3,12 @@ Authentication Endpoints - Migration từ Next.js API
 Bao gồm: login, register, logout, refresh token, verify token
 """
 
-from fastapi import APIRouter, Depends, Request, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from typing import Optional
 import asyncio
+import logging
+import time
 
 # Import schemas
 from ...schemas.auth import (
@@ -25,7 +28,7 @@ from ...schemas.auth import (
 from ...middleware.auth import (
     get_client_ip,
     rate_limit,
-    verify_token,
+    rate_limit_multi,
     sign_in_with_email_and_password,
     create_user_with_email_and_password,
     sign_out,
@@ -34,17 +37,35 @@ from ...middleware.auth import (
     extract_referral_token,
     get_error_message,
     create_access_token,
+    JWT_EXPIRATION_HOURS,
     AuthenticationError,
     TokenValidationError,
     RateLimitError
 )
+from ...middleware.auth_cache import verify_token_cached
 
 # Import placeholder services (sẽ được migrate sau)
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
 
-router = APIRouter(tags=["authentication"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["authentication"], default_response_class=ORJSONResponse)
+
+# Refresh re-signs only once less than half of the token lifetime remains
+_REFRESH_REUSE_MIN_REMAINING = JWT_EXPIRATION_HOURS * 3600 // 2  # giây
+
+# Register response constants
+_REGISTER_SUCCESS_MESSAGE = "Đăng ký thành công. Tài khoản của bạn đang chờ phê duyệt từ quản trị viên. Chúng tôi sẽ thông báo khi tài khoản được kích hoạt."
+_REFERRAL_REQUIRED_MESSAGE = "Bạn cần Mã giới thiệu hoặc truy cập từ Link giới thiệu của nhân viên hỗ trợ để đăng ký. Vui lòng liên hệ nhân viên chăm sóc để nhận thông tin."
+_REFERRAL_REQUIRED_HEADERS = {
+    "X-Requires-Referral": "true",
+    "X-Referral-Error": "true"
+}
+
+# Logout always answers with the same body - build it once
+_LOGOUT_OK = LogoutResponse(success=True, message="Đăng xuất thành công")
 
 # ========== LOGIN ENDPOINT ==========
 
@@ -61,17 +82,13 @@ router = APIRouter(tags=["authentication"])
 async def login(request: Request, login_data: LoginRequest):
     """
     Đăng nhập người dùng - tương tự Next.js POST /api/auth/login
-    Bao gồm cả GET /api/auth/login (verify token) trong cùng endpoint
+    GET /api/auth/login (verify token) được route tới verify_token_endpoint
     """
     
-    # Handle GET request for token verification
-    if request.method == "GET":
-        return await verify_token_endpoint(request)
-    
-    # Handle POST request for login
+    client_ip = get_client_ip(request)
     try:
-        # Apply rate limiting
-        client_ip = get_client_ip(request)
+        # Apply rate limiting before anything reaches the auth backend:
+        # a blocked IP must not get its password guesses checked
         await rate_limit(client_ip, "login")
 
         # Sign in with Firebase Auth equivalent
@@ -96,11 +113,12 @@ async def login(request: Request, login_data: LoginRequest):
         # TODO: Update last login in database (equivalent to Firebase updateUser)
         # await update_user_last_login(user_credential["user"]["uid"])
 
+        # User fields come from our own auth backend: build without re-validating
         return LoginResponse(
             success=True,
             message="Đăng nhập thành công",
             data={
-                "user": UserData(
+                "user": UserData.model_construct(
                     uid=user_data["uid"],
                     email=user_data["email"],
                     emailVerified=user_data["email_verified"],
@@ -124,8 +142,8 @@ async def login(request: Request, login_data: LoginRequest):
         error_message = get_error_message(e, "auth")
         
         # Apply additional rate limiting for failed login attempts
-        client_ip = get_client_ip(request)
-        await rate_limit(client_ip, "login-failed")
+        # (the "login" bucket was already recorded before sign-in)
+        await rate_limit_multi(client_ip, ["login_failed"])
         
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -133,7 +151,7 @@ async def login(request: Request, login_data: LoginRequest):
         )
     
     except Exception as e:
-        print(f"Login error: {e}")
+        logger.exception("Login error")
         
         # Handle validation errors (equivalent to Zod errors)
         if "validation" in str(e).lower() or "invalid" in str(e).lower():
@@ -149,6 +167,14 @@ async def login(request: Request, login_data: LoginRequest):
 
 # ========== VERIFY TOKEN ENDPOINT (GET /api/auth/login) ==========
 
+@router.get(
+    "/login",
+    response_model=VerifyTokenResponse,
+    responses={
+        200: {"model": VerifyTokenResponse, "description": "Token hợp lệ"},
+        401: {"model": AuthErrorResponse, "description": "Token không hợp lệ"}
+    }
+)
 async def verify_token_endpoint(request: Request) -> VerifyTokenResponse:
     """
     Verify current token - tương tự Next.js GET /api/auth/login
@@ -161,8 +187,8 @@ async def verify_token_endpoint(request: Request) -> VerifyTokenResponse:
                 detail="Không tìm thấy token xác thực"
             )
 
-        token = auth_header.split(" ")[1]
-        decoded_token = verify_token(token)
+        token = auth_header[7:]
+        decoded_token = await verify_token_cached(token)
         
         # TODO: Get user details from database (equivalent to Firebase getUser)
         # user_doc = await get_user_from_database(decoded_token["uid"])
@@ -177,10 +203,11 @@ async def verify_token_endpoint(request: Request) -> VerifyTokenResponse:
             "disabled": decoded_token.get("disabled", False),
         }
 
+        # User fields come from the verified token payload: build without re-validating
         return VerifyTokenResponse(
             success=True,
             data={
-                "user": UserData(
+                "user": UserData.model_construct(
                     uid=user_data["uid"],
                     email=user_data["email"],
                     emailVerified=user_data["email_verified"],
@@ -198,8 +225,8 @@ async def verify_token_endpoint(request: Request) -> VerifyTokenResponse:
         )
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Token verification error: {e}")
+    except Exception:
+        logger.exception("Token verification error")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token không hợp lệ"
@@ -216,7 +243,7 @@ async def verify_token_endpoint(request: Request) -> VerifyTokenResponse:
         429: {"model": AuthErrorResponse, "description": "Quá nhiều yêu cầu"}
     }
 )
-async def register(request: Request, register_data: RegisterRequest):
+async def register(request: Request, register_data: RegisterRequest, background_tasks: BackgroundTasks):
     """
     Đăng ký tài khoản mới - tương tự Next.js POST /api/auth/register
     Bao gồm referral system validation
@@ -227,18 +254,15 @@ async def register(request: Request, register_data: RegisterRequest):
         client_ip = get_client_ip(request)
         await rate_limit(client_ip, "register")
 
-        # Check referral requirement
-        ref_token = extract_referral_token(request)
+        # Check referral requirement - the link token is only looked up without a code
+        ref_token = register_data.referralCode or extract_referral_token(request)
         
         # Validate referral requirement
-        if not register_data.referralCode and not ref_token:
+        if not ref_token:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Bạn cần Mã giới thiệu hoặc truy cập từ Link giới thiệu của nhân viên hỗ trợ để đăng ký. Vui lòng liên hệ nhân viên chăm sóc để nhận thông tin.",
-                headers={
-                    "X-Requires-Referral": "true",
-                    "X-Referral-Error": "true"
-                }
+                detail=_REFERRAL_REQUIRED_MESSAGE,
+                headers=_REFERRAL_REQUIRED_HEADERS
             )
 
         # Get user agent for tracking
@@ -249,9 +273,9 @@ async def register(request: Request, register_data: RegisterRequest):
         
         # Placeholder referral processing result
         registration_record = {
-            "id": "reg_" + str(int(asyncio.get_event_loop().time())),
+            "id": "reg_" + str(int(time.time())),
             "sourceRefType": "MANUAL" if register_data.referralCode else "LINK",
-            "sourceRefCode": register_data.referralCode or ref_token,
+            "sourceRefCode": ref_token,
             "sourceRefStaffId": "staff_123",
             "sourceRefStaffName": "Nhân viên hỗ trợ",
             "conflictDetected": False
@@ -274,10 +298,10 @@ async def register(request: Request, register_data: RegisterRequest):
         # TODO: Create user document in database (equivalent to Firestore)
         # await create_user_document(user_credential["user"]["uid"], user_data)
 
-        # Send verification email
+        # Send verification email after the response is sent - the client does not wait on the provider
         verification_link = f"https://digital-utopia.app/verify-email?token=placeholder_token"
         
-        await send_email({
+        background_tasks.add_task(send_email, {
             "to": register_data.email,
             "template": "registration_pending",
             "subject": "Đăng ký thành công - Chờ phê duyệt từ quản trị viên",
@@ -294,9 +318,10 @@ async def register(request: Request, register_data: RegisterRequest):
         #     disabled: True,  # Disable until owner approves
         # })
 
-        return RegisterResponse(
+        # Built from our own values and the validated request: skip re-validation
+        return RegisterResponse.model_construct(
             success=True,
-            message="Đăng ký thành công. Tài khoản của bạn đang chờ phê duyệt từ quản trị viên. Chúng tôi sẽ thông báo khi tài khoản được kích hoạt.",
+            message=_REGISTER_SUCCESS_MESSAGE,
             data={
                 "user": {
                     "uid": user_credential["user"]["uid"],
@@ -315,7 +340,7 @@ async def register(request: Request, register_data: RegisterRequest):
         raise
     
     except Exception as e:
-        print(f"Register error: {e}")
+        logger.exception("Register error")
         
         # Handle validation errors
         if "validation" in str(e).lower() or "invalid" in str(e).lower():
@@ -354,10 +379,10 @@ async def logout(request: Request):
                 detail="Không tìm thấy token xác thực"
             )
 
-        token = auth_header.split(" ")[1]
+        token = auth_header[7:]
         
         # Verify token before logout
-        decoded_token = verify_token(token)
+        decoded_token = await verify_token_cached(token)
         
         # Sign out from system (equivalent to Firebase signOut)
         await sign_out()
@@ -365,39 +390,27 @@ async def logout(request: Request):
         # Revoke refresh token to ensure complete logout (equivalent to Firebase revokeRefreshToken)
         try:
             await revoke_refresh_token(decoded_token["uid"])
-        except Exception as revoke_error:
+        except Exception:
             # Continue logout even if token revocation fails
-            print(f"Warning: Token revocation failed: {revoke_error}")
+            logger.warning("Token revocation failed", exc_info=True)
 
-        return LogoutResponse(
-            success=True,
-            message="Đăng xuất thành công"
-        )
+        return _LOGOUT_OK
 
     except TokenValidationError as e:
         # Even if token validation fails, consider logout successful
         # This matches Next.js behavior
-        return LogoutResponse(
-            success=True,
-            message="Đăng xuất thành công"
-        )
+        return _LOGOUT_OK
     
     except HTTPException:
         # Even if token is missing, consider logout successful
         # This matches Next.js behavior
-        return LogoutResponse(
-            success=True,
-            message="Đăng xuất thành công"
-        )
+        return _LOGOUT_OK
     
-    except Exception as e:
-        print(f"Logout error: {e}")
+    except Exception:
+        logger.exception("Logout error")
         
         # Even if logout fails, return success to match Next.js behavior
-        return LogoutResponse(
-            success=True,
-            message="Đăng xuất thành công"
-        )
+        return _LOGOUT_OK
 
 # ========== REFRESH TOKEN ENDPOINT ==========
 
@@ -421,10 +434,24 @@ async def refresh_token(request: Request):
                 detail="Không tìm thấy token xác thực"
             )
 
-        current_token = auth_header.split(" ")[1]
+        current_token = auth_header[7:]
         
         # Verify current token
-        decoded_token = verify_token(current_token)
+        decoded_token = await verify_token_cached(current_token)
+        now = time.time()
+        
+        # Token still has most of its lifetime left: hand it back instead of signing a new one
+        exp = decoded_token.get("exp")
+        if exp is not None and exp - now > _REFRESH_REUSE_MIN_REMAINING:
+            return RefreshTokenResponse(
+                success=True,
+                message="Token đã được làm mới",
+                data={
+                    "token": current_token,
+                    "expiresIn": f"{int(exp - now)}s",
+                    "timestamp": now,
+                }
+            )
         
         # Create new token with updated expiration
         new_token = create_access_token({
@@ -442,7 +469,7 @@ async def refresh_token(request: Request):
             data={
                 "token": new_token,
                 "expiresIn": "1h",
-                "timestamp": asyncio.get_event_loop().time(),
+                "timestamp": now,
             }
         )
 
@@ -455,8 +482,8 @@ async def refresh_token(request: Request):
     except HTTPException:
         raise
     
-    except Exception as e:
-        print(f"Token refresh error: {e}")
+    except Exception:
+        logger.exception("Token refresh error")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Không thể làm mới token. Vui lòng đăng nhập lại"
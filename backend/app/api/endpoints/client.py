@@ -1,15 +1,31 @@
 """
 Client Endpoints - Migration từ Next.js API
 Bao gồm: dashboard, wallet-balances, transactions, exchange-rates, crypto-deposit-address, generate-vietqr
+
+Mọi handler là `async def` chạy thẳng trên event loop (uvloop): không được thêm lời gọi
+blocking vào handler - DB qua async session, việc tốn CPU qua asyncio.to_thread
 """
 
-from fastapi import APIRouter, Depends, Request, HTTPException, status, Query
-from typing import Optional, Dict, Any, List
+from fastapi import APIRouter, Depends, Header, Response, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
+from typing import Optional, Dict, Any, List, Tuple
 import asyncio
+import base64
+import hashlib
+import json
+import logging
+import math
+import secrets
+import time
 from datetime import datetime, timedelta
 
+import orjson
+
 # Import schemas
 from ...schemas.client import (
+    DashboardOverview,
+    DashboardStats,
+    FinancialDashboardData,
     DashboardResponse,
     WalletBalancesRequest,
     WalletBalanceResponse,
@@ -29,16 +45,241 @@ from ...schemas.client import (
 
 # Import middleware functions
 from ...middleware.auth import (
-    verify_token,
     TokenValidationError,
     get_client_ip,
+    get_user_data,
     rate_limit
 )
+from ...middleware.auth_cache import verify_token_cached
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["client"], default_response_class=ORJSONResponse)
+
+# Bảng dịch byte ngẫu nhiên -> ký tự Base58 (bảng chữ cái Bitcoin, bỏ 0/O/I/l),
+# dùng với bytes.translate để sinh cả chuỗi trong một lần gọi.
+# Chỉ giữ byte < 232 (= 4 * 58) để mọi ký tự có xác suất như nhau; các byte
+# 232-255 bị translate xóa luôn (rejection sampling)
+_BASE58_ALPHABET = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_BASE58_TRANSLATION = bytes(_BASE58_ALPHABET[i % 58] for i in range(256))
+_BASE58_REJECTED = bytes(range(232, 256))
+
+
+def _random_base58(length: int) -> str:
+    """Sinh chuỗi Base58 ngẫu nhiên, phân phối đều trên bảng chữ cái"""
+    out = b""
+    while len(out) < length:
+        out += secrets.token_bytes(2 * length).translate(_BASE58_TRANSLATION, _BASE58_REJECTED)
+    return out[:length].decode()
+
+
+# ========== AUTH DEPENDENCY ==========
+
+async def current_user(authorization: Optional[str] = Header(None)) -> Dict[str, Any]:
+    """
+    Xác thực Bearer token cho các endpoint client, trả về payload đã decode
+    Thiếu header -> 401 "Không tìm thấy token xác thực"; token lỗi -> 401 "Token không hợp lệ"
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Không tìm thấy token xác thực"
+        )
+
+    try:
+        return await verify_token_cached(authorization[7:])
+    except TokenValidationError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token không hợp lệ"
+        )
 
-router = APIRouter(tags=["client"])
+
+# ========== PLACEHOLDER DATA TEMPLATES ==========
+
+# TODO: Replace with PostgreSQL queries
+# Placeholder rows matching the original Next.js structure, validated once at import;
+# each request only copies them with its user id and timestamps
+
+_BALANCE_TEMPLATES = [
+    WalletBalance(
+        userId="",
+        asset="USD",
+        totalBalance=12500.50,
+        availableBalance=11800.25,
+        lockedBalance=700.25,
+        pendingBalance=0,
+        reservedBalance=0
+    ),
+    WalletBalance(
+        userId="",
+        asset="VND",
+        totalBalance=285000000,
+        availableBalance=275000000,
+        lockedBalance=10000000,
+        pendingBalance=0,
+        reservedBalance=0
+    ),
+    WalletBalance(
+        userId="",
+        asset="BTC",
+        totalBalance=0.25,
+        availableBalance=0.22,
+        lockedBalance=0.03,
+        pendingBalance=0,
+        reservedBalance=0
+    )
+]
+
+# (template, age) - createdAt = now - age, newest first
+_TRANSACTION_TEMPLATES = [
+    (
+        TransactionHistory(
+            id="tx_001",
+            userId="",
+            type="deposit",
+            category="crypto_deposit",
+            status="completed",
+            amount=500.00,
+            currency="USD",
+            fee=2.50,
+            netAmount=497.50,
+            description="Nạp tiền qua Bitcoin",
+            paymentMethod="crypto",
+            blockchainNetwork="Bitcoin"
+        ),
+        timedelta(hours=2)
+    ),
+    (
+        TransactionHistory(
+            id="tx_002",
+            userId="",
+            type="withdrawal",
+            category="bank_transfer",
+            status="pending",
+            amount=250.00,
+            currency="USD",
+            fee=5.00,
+            netAmount=245.00,
+            description="Rút tiền về ngân hàng",
+            paymentMethod="bank_transfer"
+        ),
+        timedelta(hours=6)
+    ),
+    (
+        TransactionHistory(
+            id="tx_003",
+            userId="",
+            type="deposit",
+            category="vietqr",
+            status="completed",
+            amount=5000000,
+            currency="VND",
+            fee=0,
+            netAmount=5000000,
+            description="Nạp tiền qua VietQR",
+            paymentMethod="vietqr"
+        ),
+        timedelta(days=1)
+    ),
+    (
+        TransactionHistory(
+            id="tx_004",
+            userId="",
+            type="trading",
+            category="buy_order",
+            status="completed",
+            amount=100.00,
+            currency="BTC",
+            fee=1.00,
+            netAmount=99.00,
+            description="Mua BTC"
+        ),
+        timedelta(days=2)
+    )
+]
+
+# Dashboard only shows the most recent transactions
+_DASHBOARD_TRANSACTION_COUNT = 3
+
+# Per-user data: only the user's own browser may reuse it, and only briefly
+DASHBOARD_CACHE_CONTROL = "private, max-age=5"
+
+
+def _placeholder_balances(user_id: str, now: datetime) -> List[WalletBalance]:
+    """Số dư ví placeholder cho user_id"""
+    return [
+        template.model_copy(update={"userId": user_id, "lastUpdated": now})
+        for template in _BALANCE_TEMPLATES
+    ]
+
+
+def _placeholder_transactions(
+    user_id: str,
+    now: datetime,
+    count: Optional[int] = None
+) -> List[TransactionHistory]:
+    """Giao dịch placeholder cho user_id, mới nhất trước"""
+    return [
+        template.model_copy(update={"userId": user_id, "createdAt": now - age})
+        for template, age in _TRANSACTION_TEMPLATES[:count]
+    ]
 
 # ========== DASHBOARD ENDPOINT ==========
 
+# TODO: Database queries will be implemented with PostgreSQL
+# For now, each loader returns placeholder data that matches the original Next.js structure.
+# Loaders run concurrently: give each its own session once they query the database
+
+async def _load_balances(user_id: str, now: datetime) -> List[WalletBalance]:
+    """Số dư ví (replacing Firestore query)"""
+    return _placeholder_balances(user_id, now)
+
+
+async def _load_recent_transactions(user_id: str, now: datetime) -> List[TransactionHistory]:
+    """Giao dịch gần đây (replacing Firestore query)"""
+    return _placeholder_transactions(user_id, now, _DASHBOARD_TRANSACTION_COUNT)
+
+
+async def _load_user_meta(user_id: str) -> Dict[str, Any]:
+    """Trạng thái KYC và xác thực số điện thoại"""
+    # user_data = await get_user_data(user_id)  # This would include kycStatus, phoneVerified
+    return {"kycStatus": "verified", "phoneVerified": True}  # Placeholder
+
+
+async def _load_pending(user_id: str) -> Tuple[float, float]:
+    """Tổng tiền nạp và rút đang chờ xử lý"""
+    pending_deposits = 1250.75  # Placeholder data
+    pending_withdrawals = 245.00  # From pending withdrawal above
+    return pending_deposits, pending_withdrawals
+
+
+async def _load_exchange_rates() -> Dict[str, float]:
+    """Tỷ giá (replacing Firestore query)"""
+    return {
+        "USD_VND": 24250.0,
+        "VND_USD": 1/24250,
+        "USD_CNY": 1/7.23,
+        "CNY_USD": 7.23,
+        "USD_GBP": 1/0.79,
+        "GBP_USD": 0.79,
+        "USD_EUR": 1/0.92,
+        "EUR_USD": 0.92
+    }
+
+
+def _risk_score(tx_count: int, kyc_verified: bool, phone_verified: bool, balance_count: int) -> int:
+    """
+    Điểm rủi ro dashboard (exact same logic as Next.js), tối đa 100
+    Chỉ nhận số đếm/cờ nên không phụ thuộc model; các thống kê theo giao dịch
+    được gom trong vòng lặp duy nhất của get_dashboard
+    """
+    return min(100, tx_count * 10 +
+               (20 if kyc_verified else 0) +
+               (10 if phone_verified else 0) +
+               balance_count * 5)
+
+
 @router.get(
     "/dashboard",
     response_model=DashboardResponse,
@@ -49,216 +290,139 @@ router = APIRouter(tags=["client"])
         500: {"model": ClientErrorResponse, "description": "Lỗi hệ thống"}
     }
 )
-async def get_dashboard(request: Request):
+async def get_dashboard(response: Response, user: Dict[str, Any] = Depends(current_user)):
     """
     Lấy dữ liệu dashboard - tương tự Next.js GET /api/client/dashboard
     Bao gồm tổng quan tài chính, số dư ví, giao dịch gần đây và thống kê
     """
     
     try:
-        # Verify authentication
-        auth_header = request.headers.get("authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Không tìm thấy token xác thực"
-            )
-
-        token = auth_header.split(" ")[1]
-        decoded_token = verify_token(token)
-        user_id = decoded_token["uid"]
-
-        # TODO: Database queries will be implemented with PostgreSQL
-        # For now, using placeholder data that matches the original Next.js structure
-
-        # Simulate wallet balances (replacing Firestore query)
-        balances = [
-            WalletBalance(
-                userId=user_id,
-                asset="USD",
-                totalBalance=12500.50,
-                availableBalance=11800.25,
-                lockedBalance=700.25,
-                pendingBalance=0,
-                reservedBalance=0,
-                lastUpdated=datetime.now()
-            ),
-            WalletBalance(
-                userId=user_id,
-                asset="VND",
-                totalBalance=285000000,
-                availableBalance=275000000,
-                lockedBalance=10000000,
-                pendingBalance=0,
-                reservedBalance=0,
-                lastUpdated=datetime.now()
-            ),
-            WalletBalance(
-                userId=user_id,
-                asset="BTC",
-                totalBalance=0.25,
-                availableBalance=0.22,
-                lockedBalance=0.03,
-                pendingBalance=0,
-                reservedBalance=0,
-                lastUpdated=datetime.now()
-            )
-        ]
-
-        # Simulate recent transactions (replacing Firestore query)
-        recent_transactions = [
-            TransactionHistory(
-                id="tx_001",
-                userId=user_id,
-                type="deposit",
-                category="crypto_deposit",
-                status="completed",
-                amount=500.00,
-                currency="USD",
-                fee=2.50,
-                netAmount=497.50,
-                description="Nạp tiền qua Bitcoin",
-                paymentMethod="crypto",
-                blockchainNetwork="Bitcoin",
-                createdAt=datetime.now() - timedelta(hours=2)
-            ),
-            TransactionHistory(
-                id="tx_002",
-                userId=user_id,
-                type="withdrawal",
-                category="bank_transfer",
-                status="pending",
-                amount=250.00,
-                currency="USD",
-                fee=5.00,
-                netAmount=245.00,
-                description="Rút tiền về ngân hàng",
-                paymentMethod="bank_transfer",
-                createdAt=datetime.now() - timedelta(hours=6)
-            ),
-            TransactionHistory(
-                id="tx_003",
-                userId=user_id,
-                type="deposit",
-                category="vietqr",
-                status="completed",
-                amount=5000000,
-                currency="VND",
-                fee=0,
-                netAmount=5000000,
-                description="Nạp tiền qua VietQR",
-                paymentMethod="vietqr",
-                createdAt=datetime.now() - timedelta(days=1)
-            )
-        ]
+        user_id = user["uid"]
+
+        # Independent sources: load concurrently so the dashboard waits for the
+        # slowest one rather than the sum of all of them
+        now = datetime.now()
+        (
+            balances,
+            recent_transactions,
+            user_meta,
+            (pending_deposits, pending_withdrawals),
+            exchange_rates
+        ) = await asyncio.gather(
+            _load_balances(user_id, now),
+            _load_recent_transactions(user_id, now),
+            _load_user_meta(user_id),
+            _load_pending(user_id),
+            _load_exchange_rates()
+        )
 
         # Calculate overview data (maintaining exact Next.js logic)
-        total_balance = sum(balance.availableBalance * get_conversion_rate(balance.asset) for balance in balances)
+        rates = _USD_CONVERSION_RATES
+        total_balance = math.fsum(balance.availableBalance * rates.get(balance.asset, 1) for balance in balances)
         available_balance = total_balance  # Same calculation as Next.js
-        
-        # Get pending deposits and withdrawals
-        pending_deposits = 1250.75  # Placeholder data
-        pending_withdrawals = 245.00  # From pending withdrawal above
 
-        # Calculate wallet stats
-        total_deposits = sum(tx.amount for tx in recent_transactions if tx.type == "deposit")
-        total_withdrawals = sum(tx.amount for tx in recent_transactions if tx.type == "withdrawal")
-        deposit_count = len([tx for tx in recent_transactions if tx.type == "deposit"])
-        withdrawal_count = len([tx for tx in recent_transactions if tx.type == "withdrawal"])
+        # Calculate wallet stats - one pass over the transactions
+        # (recent_transactions is sorted newest first, so the first match is the latest)
+        total_deposits = total_withdrawals = 0.0
+        largest_deposit = largest_withdrawal = 0.0
+        deposit_count = withdrawal_count = 0
+        last_deposit_at = last_withdrawal_at = None
+        for tx in recent_transactions:
+            if tx.type == "deposit":
+                amount = tx.amount
+                total_deposits += amount
+                deposit_count += 1
+                if amount > largest_deposit:
+                    largest_deposit = amount
+                if last_deposit_at is None:
+                    last_deposit_at = tx.createdAt
+            elif tx.type == "withdrawal":
+                amount = tx.amount
+                total_withdrawals += amount
+                withdrawal_count += 1
+                if amount > largest_withdrawal:
+                    largest_withdrawal = amount
+                if last_withdrawal_at is None:
+                    last_withdrawal_at = tx.createdAt
 
         # Calculate risk score (exact same logic as Next.js)
-        from ...middleware.auth import get_user_data  # Will be implemented
-        # user_data = await get_user_data(user_id)  # This would include kycStatus, phoneVerified
-        kyc_status = "verified"  # Placeholder
-        phone_verified = True  # Placeholder
+        kyc_status = user_meta["kycStatus"]
+        phone_verified = user_meta["phoneVerified"]
         
-        risk_score = min(100, len(recent_transactions) * 10 + 
-                        (20 if kyc_status == "verified" else 0) +
-                        (10 if phone_verified else 0) +
-                        (len(balances) * 5))
-
-        # Exchange rates (replacing Firestore query)
-        exchange_rates = {
-            "USD_VND": 24250,
-            "VND_USD": 1/24250,
-            "USD_CNY": 1/7.23,
-            "CNY_USD": 7.23,
-            "USD_GBP": 1/0.79,
-            "GBP_USD": 0.79,
-            "USD_EUR": 1/0.92,
-            "EUR_USD": 0.92
-        }
+        risk_score = _risk_score(
+            len(recent_transactions), kyc_status == "verified", phone_verified, len(balances)
+        )
 
         # Prepare dashboard response
-        dashboard_data = {
-            "userId": user_id,
-            "overview": {
-                "totalBalance": total_balance,
-                "availableBalance": available_balance,
-                "lockedBalance": total_balance - available_balance,
-                "pendingDeposits": pending_deposits,
-                "pendingWithdrawals": pending_withdrawals,
-                "recentActivity": recent_transactions
-            },
-            "balances": balances,
-            "recentTransactions": recent_transactions,
-            "stats": {
-                "totalDeposits": total_deposits,
-                "totalWithdrawals": total_withdrawals,
-                "netFlow": total_deposits - total_withdrawals,
-                "activeAssets": len(balances),
-                "largestDeposit": max([tx.amount for tx in recent_transactions if tx.type == "deposit"], default=0),
-                "largestWithdrawal": max([tx.amount for tx in recent_transactions if tx.type == "withdrawal"], default=0),
-                "averageDeposit": total_deposits / deposit_count if deposit_count > 0 else 0,
-                "averageWithdrawal": total_withdrawals / withdrawal_count if withdrawal_count > 0 else 0,
-                "depositCount": deposit_count,
-                "withdrawalCount": withdrawal_count,
-                "lastDepositAt": next((tx.createdAt for tx in recent_transactions if tx.type == "deposit"), None),
-                "lastWithdrawalAt": next((tx.createdAt for tx in recent_transactions if tx.type == "withdrawal"), None)
-            },
-            "riskScore": risk_score,
-            "complianceStatus": kyc_status,
-            "lastUpdated": datetime.now()
-        }
+        # Every field comes from our own computations or already-built models: the typed
+        # models are constructed directly instead of validating a nested dict
+        dashboard_data = FinancialDashboardData.model_construct(
+            userId=user_id,
+            overview=DashboardOverview.model_construct(
+                totalBalance=total_balance,
+                availableBalance=available_balance,
+                lockedBalance=total_balance - available_balance,
+                pendingDeposits=pending_deposits,
+                pendingWithdrawals=pending_withdrawals,
+                recentActivity=recent_transactions
+            ),
+            balances=balances,
+            recentTransactions=recent_transactions,
+            stats=DashboardStats.model_construct(
+                totalDeposits=total_deposits,
+                totalWithdrawals=total_withdrawals,
+                netFlow=total_deposits - total_withdrawals,
+                activeAssets=len(balances),
+                largestDeposit=largest_deposit,
+                largestWithdrawal=largest_withdrawal,
+                averageDeposit=total_deposits / deposit_count if deposit_count > 0 else 0.0,
+                averageWithdrawal=total_withdrawals / withdrawal_count if withdrawal_count > 0 else 0.0,
+                depositCount=deposit_count,
+                withdrawalCount=withdrawal_count,
+                lastDepositAt=last_deposit_at,
+                lastWithdrawalAt=last_withdrawal_at
+            ),
+            riskScore=risk_score,
+            complianceStatus=kyc_status,
+            lastUpdated=now
+        )
 
-        return DashboardResponse(
+        response.headers["Cache-Control"] = DASHBOARD_CACHE_CONTROL
+        return DashboardResponse.model_construct(
             success=True,
             data=dashboard_data,
             exchangeRates=exchange_rates
         )
 
-    except TokenValidationError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token không hợp lệ"
-        )
-    
     except HTTPException:
         raise
     
-    except Exception as e:
-        print(f"Dashboard error: {e}")
+    except Exception:
+        logger.exception("Dashboard error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Không thể lấy dữ liệu dashboard"
         )
 
 
+# Conversion rates to USD (matches Next.js dashboard logic)
+_USD_CONVERSION_RATES = {
+    "USD": 1,
+    "VND": 1/24250,
+    "CNY": 7.23,
+    "GBP": 0.79,
+    "EUR": 0.92,
+    "BTC": 1,  # Would need real-time BTC price
+    "ETH": 1   # Would need real-time ETH price
+}
+
+
 def get_conversion_rate(asset: str) -> float:
     """
     Helper function to get conversion rate to USD
     Matches Next.js dashboard logic
     """
-    rates = {
-        "USD": 1,
-        "VND": 1/24250,
-        "CNY": 7.23,
-        "GBP": 0.79,
-        "EUR": 0.92,
-        "BTC": 1,  # Would need real-time BTC price
-        "ETH": 1   # Would need real-time ETH price
-    }
-    return rates.get(asset, 1)
+    return _USD_CONVERSION_RATES.get(asset, 1)
 
 
 # ========== WALLET BALANCES ENDPOINT ==========
@@ -271,77 +435,32 @@ def get_conversion_rate(asset: str) -> float:
         401: {"model": ClientErrorResponse, "description": "Không tìm thấy token xác thực"}
     }
 )
-async def get_wallet_balances(request: Request, user_id: Optional[str] = Query(None)):
+async def get_wallet_balances(
+    user_id: Optional[str] = Query(None),
+    user: Dict[str, Any] = Depends(current_user)
+):
     """
     Lấy số dư ví - tương tự Next.js GET /api/client/wallet-balances
     """
     
     try:
-        # Verify authentication
-        auth_header = request.headers.get("authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Không tìm thấy token xác thực"
-            )
-
-        token = auth_header.split(" ")[1]
-        decoded_token = verify_token(token)
-        
         # Use provided user_id or extract from token
-        target_user_id = user_id or decoded_token["uid"]
+        target_user_id = user_id or user["uid"]
 
         # TODO: Replace with actual database query
         # This matches the Firestore query structure from Next.js
-        balances = [
-            WalletBalance(
-                userId=target_user_id,
-                asset="USD",
-                totalBalance=12500.50,
-                availableBalance=11800.25,
-                lockedBalance=700.25,
-                pendingBalance=0,
-                reservedBalance=0,
-                lastUpdated=datetime.now()
-            ),
-            WalletBalance(
-                userId=target_user_id,
-                asset="VND",
-                totalBalance=285000000,
-                availableBalance=275000000,
-                lockedBalance=10000000,
-                pendingBalance=0,
-                reservedBalance=0,
-                lastUpdated=datetime.now()
-            ),
-            WalletBalance(
-                userId=target_user_id,
-                asset="BTC",
-                totalBalance=0.25,
-                availableBalance=0.22,
-                lockedBalance=0.03,
-                pendingBalance=0,
-                reservedBalance=0,
-                lastUpdated=datetime.now()
-            )
-        ]
+        balances = _placeholder_balances(target_user_id, datetime.now())
 
         return WalletBalanceResponse(
             success=True,
             data=balances
         )
 
-    except TokenValidationError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token không hợp lệ"
-        )
-    
     except HTTPException:
         raise
     
-    except Exception as e:
-        print(f"Wallet balances error: {e}")
+    except Exception:
+        logger.exception("Wallet balances error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Không thể lấy số dư ví"
@@ -359,12 +478,12 @@ async def get_wallet_balances(request: Request, user_id: Optional[str] = Query(N
     }
 )
 async def get_transactions(
-    request: Request,
     page: int = Query(1, ge=1, description="Trang hiện tại"),
     limit: int = Query(20, ge=1, le=100, description="Số lượng mỗi trang"),
     transaction_type: Optional[str] = Query(None, alias="type", description="Lọc theo loại giao dịch"),
     status: Optional[str] = Query(None, description="Lọc theo trạng thái"),
-    currency: Optional[str] = Query(None, description="Lọc theo đơn vị tiền tệ")
+    currency: Optional[str] = Query(None, description="Lọc theo đơn vị tiền tệ"),
+    user: Dict[str, Any] = Depends(current_user)
 ):
     """
     Lấy danh sách giao dịch - tương tự Next.js GET /api/client/transactions
@@ -372,98 +491,39 @@ async def get_transactions(
     """
     
     try:
-        # Verify authentication
-        auth_header = request.headers.get("authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Không tìm thấy token xác thực"
-            )
-
-        token = auth_header.split(" ")[1]
-        decoded_token = verify_token(token)
-        user_id = decoded_token["uid"]
+        user_id = user["uid"]
 
         # TODO: Replace with actual database query with pagination and filtering
         # This matches the Firestore query structure from Next.js
-        all_transactions = [
-            TransactionHistory(
-                id="tx_001",
-                userId=user_id,
-                type="deposit",
-                category="crypto_deposit",
-                status="completed",
-                amount=500.00,
-                currency="USD",
-                fee=2.50,
-                netAmount=497.50,
-                description="Nạp tiền qua Bitcoin",
-                paymentMethod="crypto",
-                blockchainNetwork="Bitcoin",
-                createdAt=datetime.now() - timedelta(hours=2)
-            ),
-            TransactionHistory(
-                id="tx_002",
-                userId=user_id,
-                type="withdrawal",
-                category="bank_transfer",
-                status="pending",
-                amount=250.00,
-                currency="USD",
-                fee=5.00,
-                netAmount=245.00,
-                description="Rút tiền về ngân hàng",
-                paymentMethod="bank_transfer",
-                createdAt=datetime.now() - timedelta(hours=6)
-            ),
-            TransactionHistory(
-                id="tx_003",
-                userId=user_id,
-                type="deposit",
-                category="vietqr",
-                status="completed",
-                amount=5000000,
-                currency="VND",
-                fee=0,
-                netAmount=5000000,
-                description="Nạp tiền qua VietQR",
-                paymentMethod="vietqr",
-                createdAt=datetime.now() - timedelta(days=1)
-            ),
-            TransactionHistory(
-                id="tx_004",
-                userId=user_id,
-                type="trading",
-                category="buy_order",
-                status="completed",
-                amount=100.00,
-                currency="BTC",
-                fee=1.00,
-                netAmount=99.00,
-                description="Mua BTC",
-                createdAt=datetime.now() - timedelta(days=2)
-            )
-        ]
-
-        # Apply filters
-        filtered_transactions = all_transactions
-        
-        if transaction_type:
-            filtered_transactions = [tx for tx in filtered_transactions if tx.type == transaction_type]
-        
-        if status:
-            filtered_transactions = [tx for tx in filtered_transactions if tx.status == status]
-        
-        if currency:
-            filtered_transactions = [tx for tx in filtered_transactions if tx.currency == currency]
-
-        # Apply pagination
+        # Filters, ordering and pagination belong in SQL so the query is an index seek on
+        # ix_transactions_user_id_created_at rather than a full scan + Python filter:
+        #   select(Transaction)
+        #       .where(Transaction.user_id == uid, *conds)  # type/status/asset if given
+        #       .order_by(Transaction.created_at.desc())
+        #       .limit(limit).offset((page - 1) * limit)
+        # with total_items from a separate select(func.count()) on the same conditions.
+        # Related rows (e.g. payment method metadata) are loaded with selectinload or one
+        # batched `WHERE id IN (...)` query - never one query per transaction.
+        all_transactions = _placeholder_transactions(user_id, datetime.now())
+
+        # Apply filters and pagination in one pass - only the requested page is materialized
         start_index = (page - 1) * limit
         end_index = start_index + limit
-        paginated_transactions = filtered_transactions[start_index:end_index]
+        paginated_transactions = []
+        total_items = 0
+
+        for tx in all_transactions:
+            if transaction_type and tx.type != transaction_type:
+                continue
+            if status and tx.status != status:
+                continue
+            if currency and tx.currency != currency:
+                continue
+            if start_index <= total_items < end_index:
+                paginated_transactions.append(tx)
+            total_items += 1
 
         # Calculate pagination info
-        total_items = len(filtered_transactions)
         total_pages = (total_items + limit - 1) // limit
 
         return TransactionsResponse(
@@ -479,17 +539,11 @@ async def get_transactions(
             }
         )
 
-    except TokenValidationError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token không hợp lệ"
-        )
-    
     except HTTPException:
         raise
     
-    except Exception as e:
-        print(f"Transactions error: {e}")
+    except Exception:
+        logger.exception("Transactions error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Không thể lấy danh sách giao dịch"
@@ -498,6 +552,120 @@ async def get_transactions(
 
 # ========== EXCHANGE RATES ENDPOINT ==========
 
+# Rates change on a minute scale: the serialized response is reused for this long
+EXCHANGE_RATES_CACHE_TTL = 300  # seconds
+
+# Browsers/CDN may reuse the response this long without asking again
+EXCHANGE_RATES_CACHE_CONTROL = "public, max-age=30"
+
+# (built at, time.monotonic(); JSON body; ETag of the body)
+_exchange_rates_cache: Optional[Tuple[float, bytes, str]] = None
+
+
+def _load_exchange_rate_list() -> List[ExchangeRate]:
+    """Danh sách tỷ giá hối đoái"""
+    # TODO: Replace with actual database query
+    # This matches the Firestore query structure from Next.js
+    now = datetime.now()
+    return [
+        ExchangeRate(
+            id="rate_001",
+            baseAsset="USD",
+            targetAsset="VND",
+            rate=24250.0,
+            isActive=True,
+            priority=1,
+            lastUpdated=now
+        ),
+        ExchangeRate(
+            id="rate_002",
+            baseAsset="VND",
+            targetAsset="USD",
+            rate=1/24250.0,
+            isActive=True,
+            priority=2,
+            lastUpdated=now
+        ),
+        ExchangeRate(
+            id="rate_003",
+            baseAsset="USD",
+            targetAsset="CNY",
+            rate=7.23,
+            isActive=True,
+            priority=3,
+            lastUpdated=now
+        ),
+        ExchangeRate(
+            id="rate_004",
+            baseAsset="CNY",
+            targetAsset="USD",
+            rate=1/7.23,
+            isActive=True,
+            priority=4,
+            lastUpdated=now
+        ),
+        ExchangeRate(
+            id="rate_005",
+            baseAsset="USD",
+            targetAsset="GBP",
+            rate=0.79,
+            isActive=True,
+            priority=5,
+            lastUpdated=now
+        ),
+        ExchangeRate(
+            id="rate_006",
+            baseAsset="GBP",
+            targetAsset="USD",
+            rate=1/0.79,
+            isActive=True,
+            priority=6,
+            lastUpdated=now
+        ),
+        ExchangeRate(
+            id="rate_007",
+            baseAsset="USD",
+            targetAsset="EUR",
+            rate=0.92,
+            isActive=True,
+            priority=7,
+            lastUpdated=now
+        ),
+        ExchangeRate(
+            id="rate_008",
+            baseAsset="EUR",
+            targetAsset="USD",
+            rate=1/0.92,
+            isActive=True,
+            priority=8,
+            lastUpdated=now
+        )
+    ]
+
+
+def refresh_exchange_rates_cache() -> Tuple[float, bytes, str]:
+    """
+    Build lại body JSON của /exchange-rates (kèm ETag) và lưu vào cache
+    Gọi khi startup để request đầu tiên không phải chờ build; handler tự refresh khi hết TTL
+    """
+    global _exchange_rates_cache
+
+    body = orjson.dumps(
+        ExchangeRatesResponse(success=True, data=_load_exchange_rate_list()).model_dump(mode="json")
+    )
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    _exchange_rates_cache = (time.monotonic(), body, etag)
+    return _exchange_rates_cache
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match của client có khớp ETag hiện tại không"""
+    return bool(if_none_match) and (
+        if_none_match.strip() == "*"
+        or etag in (tag.strip() for tag in if_none_match.split(","))
+    )
+
+
 @router.get(
     "/exchange-rates",
     response_model=ExchangeRatesResponse,
@@ -505,100 +673,30 @@ async def get_transactions(
         200: {"model": ExchangeRatesResponse, "description": "Lấy tỷ giá hối đoái thành công"}
     }
 )
-async def get_exchange_rates():
+async def get_exchange_rates(if_none_match: Optional[str] = Header(None)):
     """
     Lấy tỷ giá hối đoái - tương tự Next.js GET /api/client/exchange-rates
+    Response đã serialize được cache trong bộ nhớ EXCHANGE_RATES_CACHE_TTL giây;
+    client gửi lại ETag qua If-None-Match nhận 304 không có body
     """
-    
-    try:
-        # TODO: Replace with actual database query
-        # This matches the Firestore query structure from Next.js
-        exchange_rates = [
-            ExchangeRate(
-                id="rate_001",
-                baseAsset="USD",
-                targetAsset="VND",
-                rate=24250.0,
-                isActive=True,
-                priority=1,
-                lastUpdated=datetime.now()
-            ),
-            ExchangeRate(
-                id="rate_002",
-                baseAsset="VND",
-                targetAsset="USD",
-                rate=1/24250.0,
-                isActive=True,
-                priority=2,
-                lastUpdated=datetime.now()
-            ),
-            ExchangeRate(
-                id="rate_003",
-                baseAsset="USD",
-                targetAsset="CNY",
-                rate=7.23,
-                isActive=True,
-                priority=3,
-                lastUpdated=datetime.now()
-            ),
-            ExchangeRate(
-                id="rate_004",
-                baseAsset="CNY",
-                targetAsset="USD",
-                rate=1/7.23,
-                isActive=True,
-                priority=4,
-                lastUpdated=datetime.now()
-            ),
-            ExchangeRate(
-                id="rate_005",
-                baseAsset="USD",
-                targetAsset="GBP",
-                rate=0.79,
-                isActive=True,
-                priority=5,
-                lastUpdated=datetime.now()
-            ),
-            ExchangeRate(
-                id="rate_006",
-                baseAsset="GBP",
-                targetAsset="USD",
-                rate=1/0.79,
-                isActive=True,
-                priority=6,
-                lastUpdated=datetime.now()
-            ),
-            ExchangeRate(
-                id="rate_007",
-                baseAsset="USD",
-                targetAsset="EUR",
-                rate=0.92,
-                isActive=True,
-                priority=7,
-                lastUpdated=datetime.now()
-            ),
-            ExchangeRate(
-                id="rate_008",
-                baseAsset="EUR",
-                targetAsset="USD",
-                rate=1/0.92,
-                isActive=True,
-                priority=8,
-                lastUpdated=datetime.now()
+    cached = _exchange_rates_cache
+    if cached is None or time.monotonic() - cached[0] >= EXCHANGE_RATES_CACHE_TTL:
+        try:
+            cached = refresh_exchange_rates_cache()
+        except Exception:
+            logger.exception("Exchange rates error")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Không thể lấy tỷ giá hối đoái"
             )
-        ]
 
-        return ExchangeRatesResponse(
-            success=True,
-            data=exchange_rates
-        )
+    _, body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": EXCHANGE_RATES_CACHE_CONTROL}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    except Exception as e:
-        print(f"Exchange rates error: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Không thể lấy tỷ giá hối đoái"
-        )
+    # Cached body is already serialized JSON - return the bytes as-is
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # ========== CRYPTO DEPOSIT ADDRESS ENDPOINT ==========
@@ -612,23 +710,15 @@ async def get_exchange_rates():
         401: {"model": ClientErrorResponse, "description": "Không tìm thấy token xác thực"}
     }
 )
-async def create_crypto_deposit_address(request: Request, crypto_request: CryptoDepositAddressRequest):
+async def create_crypto_deposit_address(
+    crypto_request: CryptoDepositAddressRequest,
+    user: Dict[str, Any] = Depends(current_user)
+):
     """
     Tạo địa chỉ nạp crypto - tương tự Next.js POST /api/client/crypto-deposit-address
     """
     
     try:
-        # Verify authentication
-        auth_header = request.headers.get("authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Không tìm thấy token xác thực"
-            )
-
-        token = auth_header.split(" ")[1]
-        decoded_token = verify_token(token)
-
         # Validate supported currencies
         supported_currencies = ["BTC", "ETH", "USDT", "BNB", "ADA", "DOT"]
         if crypto_request.currency.upper() not in supported_currencies:
@@ -639,23 +729,21 @@ async def create_crypto_deposit_address(request: Request, crypto_request: Crypto
 
         # TODO: Replace with actual crypto address generation service
         # This would integrate with actual blockchain APIs
-        import secrets
-        import string
-        
+
         # Generate a realistic-looking crypto address
         if crypto_request.currency.upper() == "BTC":
-            address = "1" + ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(33))
+            address = "1" + _random_base58(33)
         elif crypto_request.currency.upper() == "ETH":
-            address = "0x" + ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(40))
+            address = "0x" + secrets.token_bytes(20).hex()
         else:
             address = secrets.token_hex(32)
 
         # Generate QR code (placeholder)
-        import base64
         qr_code = base64.b64encode(f"Address: {address}\nAmount: 0\nCurrency: {crypto_request.currency}".encode()).decode()
 
         # Set expiration time
-        expires_at = datetime.now() + timedelta(hours=24)
+        now = datetime.now()
+        expires_at = now + timedelta(hours=24)
 
         deposit_address_data = {
             "address": address,
@@ -663,7 +751,7 @@ async def create_crypto_deposit_address(request: Request, crypto_request: Crypto
             "network": crypto_request.network or get_default_network(crypto_request.currency.upper()),
             "qrCode": qr_code,
             "memo": None,  # Would be populated for currencies like XRP, XLM
-            "createdAt": datetime.now(),
+            "createdAt": now,
             "expiresAt": expires_at
         }
 
@@ -672,17 +760,11 @@ async def create_crypto_deposit_address(request: Request, crypto_request: Crypto
             data=deposit_address_data
         )
 
-    except TokenValidationError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token không hợp lệ"
-        )
-    
     except HTTPException:
         raise
     
-    except Exception as e:
-        print(f"Crypto deposit address error: {e}")
+    except Exception:
+        logger.exception("Crypto deposit address error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Không thể tạo địa chỉ nạp crypto"
@@ -713,30 +795,20 @@ def get_default_network(currency: str) -> str:
         401: {"model": ClientErrorResponse, "description": "Không tìm thấy token xác thực"}
     }
 )
-async def generate_vietqr(request: Request, qr_request: GenerateVietQRRequest):
+async def generate_vietqr(
+    qr_request: GenerateVietQRRequest,
+    user: Dict[str, Any] = Depends(current_user)
+):
     """
     Tạo QR code thanh toán VietQR - tương tự Next.js POST /api/client/generate-vietqr
     """
     
     try:
-        # Verify authentication
-        auth_header = request.headers.get("authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Không tìm thấy token xác thực"
-            )
-
-        token = auth_header.split(" ")[1]
-        decoded_token = verify_token(token)
-
         # TODO: Replace with actual VietQR generation service
         # This would integrate with VietQR API
-        import secrets
-        import string
-        
+
         # Generate unique payment ID
-        payment_id = "VQR" + ''.join(secrets.choice(string.digits) for _ in range(12))
+        payment_id = f"VQR{secrets.randbelow(10 ** 12):012d}"
         
         # Generate QR data (VietQR format)
         qr_data = {
@@ -750,21 +822,19 @@ async def generate_vietqr(request: Request, qr_request: GenerateVietQRRequest):
         }
 
         # Generate QR code
-        import base64
-        import json
-        
         qr_content = json.dumps(qr_data, separators=(',', ':'))
         qr_code = base64.b64encode(qr_content.encode()).decode()
         
         # Generate payment URL
         payment_url = f"https://vietqr.net/pay/{payment_id}"
 
+        now = datetime.now()
         vietqr_data = {
             **qr_data,
             "qrCode": qr_code,
             "paymentUrl": payment_url,
-            "createdAt": datetime.now().isoformat(),
-            "expiresAt": (datetime.now() + timedelta(hours=24)).isoformat()
+            "createdAt": now.isoformat(),
+            "expiresAt": (now + timedelta(hours=24)).isoformat()
         }
 
         return VietQRResponse(
@@ -774,17 +844,11 @@ async def generate_vietqr(request: Request, qr_request: GenerateVietQRRequest):
             paymentUrl=payment_url
         )
 
-    except TokenValidationError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token không hợp lệ"
-        )
-    
     except HTTPException:
         raise
     
-    except Exception as e:
-        print(f"VietQR generation error: {e}")
+    except Exception:
+        logger.exception("VietQR generation error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Không thể tạo VietQR"
@@ -4,9 +4,11 @@
 # Purpose: FastAPI endpoints for compliance module
 
 from typing import List, Optional, Dict, Any, Union
-from fastapi import APIRouter, HTTPException, Depends, Query, Path, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Path, Request, Body
 from fastapi.responses import JSONResponse
 from datetime import datetime, timedelta
+from difflib import SequenceMatcher
+from functools import lru_cache
 import random
 import string
 import uuid
@@ -18,7 +20,7 @@ from app.schemas.compliance import (
     PersonalInfo, AddressInfo, IdentityDocument, VerificationHistory,
     
     # AML Schemas
-    AMLScreening, AMLScreeningRequest, AMLMonitoringRequest, AMLUpdateRequest, AMLFinding,
+    AMLScreening, AMLScreeningRequest, AMLBatchScreeningItem, AMLMonitoringRequest, AMLUpdateRequest, AMLFinding,
     
     # Monitoring Schemas
     TransactionMonitoring, SuspiciousActivity, MonitoringFlag,
@@ -44,18 +46,20 @@ from app.schemas.compliance import (
 )
 
 # Import dependencies
-from app.middleware.auth import get_current_user
+from app.middleware.auth import get_current_user, require_admin
 
 router = APIRouter()
 
 # In-memory storage (in production, use database)
 # KYC Data
 kyc_profiles: List[KYCProfile] = []
+kyc_by_user: Dict[str, KYCProfile] = {}  # userId -> profile (one profile per user)
 kyc_documents: List[IdentityDocument] = []
 kyc_verification_history: List[VerificationHistory] = []
 
 # AML Data
 aml_screenings: List[AMLScreening] = []
+aml_by_user: Dict[str, AMLScreening] = {}  # userId -> screening (one record per user)
 transaction_monitorings: List[TransactionMonitoring] = []
 suspicious_activities: List[SuspiciousActivity] = []
 
@@ -72,6 +76,13 @@ pep_database: List[PEPEntry] = []
 watchlists: List[WatchlistEntry] = []
 screening_results: List[ScreeningResult] = []
 
+# Name indexes (lowercased) - rebuilt by rebuild_name_indexes() whenever the lists above change
+sanctions_name_index: Dict[str, SanctionsEntry] = {}  # normalized name + aliases -> entry, for AML screening
+sanctions_choices: List[str] = []  # keys of sanctions_name_index, for fuzzy screening
+sanctions_by_name: Dict[str, List[SanctionsEntry]] = {}
+pep_by_name: Dict[str, List[PEPEntry]] = {}
+watchlist_by_name: Dict[str, List[WatchlistEntry]] = {}
+
 # Dashboard
 risk_alerts: List[RiskAlert] = []
 compliance_alerts: List[ComplianceAlert] = []
@@ -80,6 +91,7 @@ risk_limits: List[RiskLimit] = []
 # Audit
 audit_logs: List[AuditLogEntry] = []
 security_events: List[SecurityEvent] = []
+security_by_id: Dict[str, SecurityEvent] = {}
 compliance_events: List[ComplianceEvent] = []
 
 # Helper functions
@@ -165,8 +177,65 @@ def initialize_default_data():
         )
     ]
 
+def _index_by_name(entries: list) -> Dict[str, list]:
+    """Group entries by lowercased name, keeping list order"""
+    index: Dict[str, list] = {}
+    for entry in entries:
+        index.setdefault(entry.name.lower(), []).append(entry)
+    return index
+
+def rebuild_name_indexes():
+    """Rebuild the sanctions/PEP/watchlist name indexes from the current lists"""
+    global sanctions_name_index, sanctions_choices, sanctions_by_name, pep_by_name, watchlist_by_name
+    
+    name_index: Dict[str, SanctionsEntry] = {}
+    for entry in sanctions_lists:
+        for entry_name in [entry.name, *(entry.aliases or [])]:
+            name_index.setdefault(normalize_name(entry_name), entry)
+    
+    sanctions_name_index = name_index
+    sanctions_choices = list(name_index)
+    sanctions_by_name = _index_by_name(sanctions_lists)
+    pep_by_name = _index_by_name(pep_database)
+    watchlist_by_name = _index_by_name(watchlists)
+    
+    # Cached fuzzy results refer to the old lists
+    fuzzy_sanctions.cache_clear()
+
+def normalize_name(name: str) -> str:
+    """Lowercase and collapse whitespace so equivalent queries share index/cache keys"""
+    return " ".join(name.lower().split())
+
+# Minimum similarity (0-100) for a fuzzy sanctions hit
+FUZZY_SANCTIONS_CUTOFF = 85
+
+@lru_cache(maxsize=10000)
+def fuzzy_sanctions(name_norm: str) -> Optional[tuple]:
+    """
+    Best fuzzy sanctions match for a normalized name: (matched name, score) or None
+    Catches near-miss spellings ("jon smith" vs "john smith") that the exact index misses
+    """
+    best = None
+    for choice in sanctions_choices:
+        matcher = SequenceMatcher(None, name_norm, choice)
+        # Cheap upper bounds first; only compute the full ratio when they can reach the cutoff
+        if matcher.real_quick_ratio() * 100 < FUZZY_SANCTIONS_CUTOFF or matcher.quick_ratio() * 100 < FUZZY_SANCTIONS_CUTOFF:
+            continue
+        score = round(matcher.ratio() * 100)
+        if score >= FUZZY_SANCTIONS_CUTOFF and (best is None or score > best[1]):
+            best = (choice, score)
+    return best
+
+def match_names(index: Dict[str, list], query: str):
+    """Exact and partial (substring) name matches for query in a name index"""
+    query = query.lower()
+    exact = list(index.get(query, []))
+    partial = [entry for name, entries in index.items() if name != query and query in name for entry in entries]
+    return exact, partial
+
 # Initialize data on module load
 initialize_default_data()
+rebuild_name_indexes()
 
 # ==================== AML ENDPOINTS ====================
 
@@ -174,14 +243,12 @@ initialize_default_data()
 async def get_aml_screening():
     """Get AML screening status for authenticated user"""
     try:
-        user_id = current_user["id"]
+        now = datetime.now()
+        now_iso = now.isoformat()
+        user_id = current_user["uid"]
         
-        # Find latest AML screening for user
-        aml_screening = None
-        for screening in aml_screenings:
-            if screening.userId == user_id:
-                if aml_screening is None or screening.lastChecked > aml_screening.lastChecked:
-                    aml_screening = screening
+        # Find AML screening for user (records are updated in place, one per user)
+        aml_screening = aml_by_user.get(user_id)
         
         if not aml_screening:
             # Create initial AML screening
@@ -192,86 +259,114 @@ async def get_aml_screening():
                 status="clean",
                 riskLevel="low",
                 findings=[],
-                lastChecked=datetime.now().isoformat(),
-                nextReview=(datetime.now() + timedelta(days=30)).isoformat()
+                lastChecked=now_iso,
+                nextReview=(now + timedelta(days=30)).isoformat()
             )
             aml_screenings.append(aml_screening)
+            aml_by_user[user_id] = aml_screening
         
         return {
             "success": True,
             "data": aml_screening.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve AML screening: {str(e)}")
 
+# Maximum number of screenings accepted by POST /aml/batch
+AML_BATCH_MAX_ITEMS = 100
+
+def _screen_one(request: AMLScreeningRequest, user_id: str, now: datetime) -> AMLScreening:
+    """Screen one user's name against the sanctions index and create/update their AML record"""
+    if not request.personalInfo or not request.personalInfo.get("name"):
+        raise HTTPException(status_code=400, detail="Personal information with name is required for AML screening")
+    
+    now_iso = now.isoformat()
+    all_findings: List[AMLFinding] = []
+    name = request.personalInfo["name"]
+    
+    # Simulate sanctions screening: exact name/alias match first, fuzzy only on a miss
+    name_norm = normalize_name(name)
+    if name_norm in sanctions_name_index:
+        all_findings.append(AMLFinding(
+            category="sanctions",
+            source="OFAC Sanctions List",
+            description=f"Name match found in sanctions list: {name}",
+            severity="high",
+            confidence=85,
+            actionTaken="Flagged for review",
+            timestamp=now_iso
+        ))
+    else:
+        fuzzy_match = fuzzy_sanctions(name_norm)
+        if fuzzy_match:
+            matched_name, score = fuzzy_match
+            all_findings.append(AMLFinding(
+                category="sanctions",
+                source="OFAC Sanctions List",
+                description=f"Possible name match in sanctions list: {name} ~ {sanctions_name_index[matched_name].name}",
+                severity="medium",
+                confidence=score,
+                actionTaken="Flagged for manual review",
+                timestamp=now_iso
+            ))
+    
+    # Determine overall risk level and status
+    risk_level = "low"
+    status = "clean"
+    
+    high_severity_findings = [f for f in all_findings if f.severity in ["high", "critical"]]
+    
+    if high_severity_findings:
+        risk_level = "high"
+        status = "flagged"
+    elif all_findings:
+        risk_level = "medium"
+        status = "flagged"
+    
+    next_review = (now + timedelta(days=90 if risk_level == "low" else 30)).isoformat()
+    
+    # Create or update AML screening record
+    aml_screening = aml_by_user.get(user_id)
+    
+    if not aml_screening:
+        aml_screening = AMLScreening(
+            id=generate_id(),
+            userId=user_id,
+            screeningType=request.screeningType,
+            status=status,
+            riskLevel=risk_level,
+            findings=all_findings,
+            lastChecked=now_iso,
+            nextReview=next_review
+        )
+        aml_screenings.append(aml_screening)
+        aml_by_user[user_id] = aml_screening
+    else:
+        aml_screening.screeningType = request.screeningType
+        aml_screening.status = status
+        aml_screening.riskLevel = risk_level
+        aml_screening.findings = all_findings
+        aml_screening.lastChecked = now_iso
+        aml_screening.nextReview = next_review
+    
+    return aml_screening
+
 @router.post("/aml", response_model=Dict[str, Any])
 async def perform_aml_screening(
-    request: AMLScreeningRequest
+    request: AMLScreeningRequest,
+    current_user: dict = Depends(get_current_user)
 ):
     """Perform AML screening"""
     try:
-        user_id = current_user["id"]
-        
-        if not request.personalInfo or not request.personalInfo.get("name"):
-            raise HTTPException(status_code=400, detail="Personal information with name is required for AML screening")
-        
-        all_findings: List[AMLFinding] = []
-        name = request.personalInfo["name"]
-        
-        # Simulate sanctions screening
-        if any(name.lower() == entry.name.lower() for entry in sanctions_lists):
-            all_findings.append(AMLFinding(
-                category="sanctions",
-                source="OFAC Sanctions List",
-                description=f"Name match found in sanctions list: {name}",
-                severity="high",
-                confidence=85,
-                actionTaken="Flagged for review",
-                timestamp=datetime.now().isoformat()
-            ))
-        
-        # Determine overall risk level and status
-        risk_level = "low"
-        status = "clean"
-        
-        high_severity_findings = [f for f in all_findings if f.severity in ["high", "critical"]]
-        
-        if high_severity_findings:
-            risk_level = "high"
-            status = "flagged"
-        elif all_findings:
-            risk_level = "medium"
-            status = "flagged"
-        
-        # Create or update AML screening record
-        aml_screening = next((s for s in aml_screenings if s.userId == user_id), None)
-        
-        if not aml_screening:
-            aml_screening = AMLScreening(
-                id=generate_id(),
-                userId=user_id,
-                screeningType=request.screeningType,
-                status=status,
-                riskLevel=risk_level,
-                findings=all_findings,
-                lastChecked=datetime.now().isoformat(),
-                nextReview=(datetime.now() + timedelta(days=90 if risk_level == "low" else 30)).isoformat()
-            )
-            aml_screenings.append(aml_screening)
-        else:
-            aml_screening.screeningType = request.screeningType
-            aml_screening.status = status
-            aml_screening.riskLevel = risk_level
-            aml_screening.findings = all_findings
-            aml_screening.lastChecked = datetime.now().isoformat()
-            aml_screening.nextReview = (datetime.now() + timedelta(days=90 if risk_level == "low" else 30)).isoformat()
+        now = datetime.now()
+        aml_screening = _screen_one(request, current_user["uid"], now)
         
         return {
             "success": True,
             "data": aml_screening.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now.isoformat()
         }
         
     except HTTPException:
@@ -279,6 +374,31 @@ async def perform_aml_screening(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to perform AML screening: {str(e)}")
 
+@router.post("/aml/batch", response_model=Dict[str, Any])
+async def perform_aml_screening_batch(
+    requests: List[AMLBatchScreeningItem] = Body(..., min_length=1, max_length=AML_BATCH_MAX_ITEMS),
+    decoded_token: Dict[str, Any] = Depends(require_admin)
+):
+    """Perform AML screening for several users in one call (admin only)"""
+    # One timestamp for the whole batch; a failing item does not abort the others
+    now = datetime.now()
+    results = []
+    errors = []
+    
+    for index, item in enumerate(requests):
+        try:
+            results.append(_screen_one(item, item.userId, now).dict())
+        except HTTPException as e:
+            errors.append({"index": index, "userId": item.userId, "detail": e.detail})
+        except Exception as e:
+            errors.append({"index": index, "userId": item.userId, "detail": f"Failed to perform AML screening: {str(e)}"})
+    
+    return {
+        "success": not errors,
+        "data": {"results": results, "errors": errors},
+        "timestamp": now.isoformat()
+    }
+
 @router.post("/aml/monitor", response_model=Dict[str, Any])
 async def monitor_transaction_aml(
     request: AMLMonitoringRequest,
@@ -286,7 +406,8 @@ async def monitor_transaction_aml(
 ):
     """Monitor transaction for AML compliance"""
     try:
-        user_id = current_user["id"]
+        now_iso = datetime.now().isoformat()
+        user_id = current_user["uid"]
         
         # Assess transaction risk
         flags: List[MonitoringFlag] = []
@@ -327,7 +448,7 @@ async def monitor_transaction_aml(
             riskScore=sum(25 if f.severity == "critical" else 15 if f.severity == "high" else 10 if f.severity == "medium" else 5 for f in flags),
             flags=flags,
             reviewed=False,
-            createdAt=datetime.now().isoformat()
+            createdAt=now_iso
         )
         
         transaction_monitorings.append(monitoring)
@@ -344,13 +465,13 @@ async def monitor_transaction_aml(
                 riskLevel="critical",
                 status="reported",
                 reportedBy="AML System",
-                reportedAt=datetime.now().isoformat(),
+                reportedAt=now_iso,
                 investigationNotes="Auto-generated suspicious activity report based on AML rules"
             )
             suspicious_activities.append(suspicious_activity)
             
             # Update screening status
-            user_screening = next((s for s in aml_screenings if s.userId == user_id), None)
+            user_screening = aml_by_user.get(user_id)
             if user_screening:
                 user_screening.status = "reported"
                 user_screening.riskLevel = "critical"
@@ -358,7 +479,7 @@ async def monitor_transaction_aml(
         return {
             "success": True,
             "data": monitoring.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except Exception as e:
@@ -371,12 +492,13 @@ async def update_aml_screening(
 ):
     """Update AML screening (admin only)"""
     try:
+        now_iso = datetime.now().isoformat()
         # Check admin privileges
         admin_role = getattr(current_user, 'admin_role', None)
         if admin_role not in ['compliance_officer', 'admin']:
             raise HTTPException(status_code=403, detail="Admin privileges required for AML status updates")
         
-        aml_screening = next((s for s in aml_screenings if s.userId == request.targetUserId), None)
+        aml_screening = aml_by_user.get(request.targetUserId)
         
         if not aml_screening:
             raise HTTPException(status_code=404, detail="AML screening record not found")
@@ -391,12 +513,12 @@ async def update_aml_screening(
         if request.additionalFindings:
             aml_screening.findings.extend(request.additionalFindings)
         
-        aml_screening.lastChecked = datetime.now().isoformat()
+        aml_screening.lastChecked = now_iso
         
         return {
             "success": True,
             "data": aml_screening.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -408,6 +530,7 @@ async def update_aml_screening(
 async def get_aml_metrics(current_user: dict = Depends(get_current_user)):
     """Get compliance metrics (admin only)"""
     try:
+        now_iso = datetime.now().isoformat()
         admin_role = getattr(current_user, 'admin_role', None)
         if admin_role not in ['compliance_officer', 'admin']:
             raise HTTPException(status_code=403, detail="Admin privileges required for compliance metrics")
@@ -446,13 +569,13 @@ async def get_aml_metrics(current_user: dict = Depends(get_current_user)):
                 "kycCompletionRate": 95
             },
             auditFindings=[],
-            calculatedAt=datetime.now().isoformat()
+            calculatedAt=now_iso
         )
         
         return {
             "success": True,
             "data": metrics.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -476,7 +599,7 @@ async def get_audit_logs(
 ):
     """Get audit logs"""
     try:
-        user_id = current_user["id"]
+        user_id = current_user["uid"]
         admin_role = getattr(current_user, 'admin_role', None)
         
         filtered_logs = audit_logs.copy()
@@ -542,11 +665,12 @@ async def create_audit_log(
 ):
     """Create audit log entry"""
     try:
-        user_id = current_user["id"]
+        now_iso = datetime.now().isoformat()
+        user_id = current_user["uid"]
         
         audit_log = AuditLogEntry(
             id=generate_id(),
-            timestamp=datetime.now().isoformat(),
+            timestamp=now_iso,
             userId=user_id,
             userRole=getattr(current_user, 'admin_role', 'user'),
             action=request.action,
@@ -566,7 +690,7 @@ async def create_audit_log(
         return {
             "success": True,
             "data": audit_log.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except Exception as e:
@@ -638,11 +762,12 @@ async def create_security_event(
 ):
     """Create security event"""
     try:
-        user_id = current_user["id"]
+        now_iso = datetime.now().isoformat()
+        user_id = current_user["uid"]
         
         security_event = SecurityEvent(
             id=generate_id(),
-            timestamp=datetime.now().isoformat(),
+            timestamp=now_iso,
             eventType=request.eventType,
             userId=request.targetUserId,
             ipAddress=current_request.client.host if current_request.client else "unknown",
@@ -653,11 +778,12 @@ async def create_security_event(
         )
         
         security_events.append(security_event)
+        security_by_id[security_event.id] = security_event
         
         # Also create audit log
         audit_log = AuditLogEntry(
             id=generate_id(),
-            timestamp=datetime.now().isoformat(),
+            timestamp=now_iso,
             userId=user_id,
             action=f"SECURITY_EVENT_{request.eventType.upper()}",
             resource="security",
@@ -673,7 +799,7 @@ async def create_security_event(
         return {
             "success": True,
             "data": security_event.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except Exception as e:
@@ -687,11 +813,12 @@ async def update_security_event(
 ):
     """Update security event (admin only)"""
     try:
+        now_iso = datetime.now().isoformat()
         admin_role = getattr(current_user, 'admin_role', None)
         if admin_role not in ['compliance_officer', 'admin']:
             raise HTTPException(status_code=403, detail="Admin privileges required for updating security events")
         
-        security_event = next((e for e in security_events if e.id == event_id), None)
+        security_event = security_by_id.get(event_id)
         
         if not security_event:
             raise HTTPException(status_code=404, detail="Security event not found")
@@ -704,18 +831,18 @@ async def update_security_event(
             security_event.mitigationActions = request.mitigationActions
         
         if request.mitigated:
-            security_event.resolvedAt = datetime.now().isoformat()
+            security_event.resolvedAt = now_iso
         
         # Add notes
         if request.notes:
             security_event.details["notes"] = request.notes
-            security_event.details["lastUpdatedBy"] = current_user["id"]
-            security_event.details["lastUpdatedAt"] = datetime.now().isoformat()
+            security_event.details["lastUpdatedBy"] = current_user["uid"]
+            security_event.details["lastUpdatedAt"] = now_iso
         
         return {
             "success": True,
             "data": security_event.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -729,10 +856,11 @@ async def update_security_event(
 async def get_kyc_status(current_user: dict = Depends(get_current_user)):
     """Get KYC status for authenticated user"""
     try:
-        user_id = current_user["id"]
+        now_iso = datetime.now().isoformat()
+        user_id = current_user["uid"]
         
         # Find existing KYC profile
-        kyc_profile = next((p for p in kyc_profiles if p.userId == user_id), None)
+        kyc_profile = kyc_by_user.get(user_id)
         
         if not kyc_profile:
             # Create initial KYC profile if doesn't exist
@@ -745,10 +873,11 @@ async def get_kyc_status(current_user: dict = Depends(get_current_user)):
                 addressInfo=None,
                 identityDocuments=[],
                 verificationHistory=[],
-                createdAt=datetime.now().isoformat(),
-                updatedAt=datetime.now().isoformat()
+                createdAt=now_iso,
+                updatedAt=now_iso
             )
             kyc_profiles.append(kyc_profile)
+            kyc_by_user[user_id] = kyc_profile
             
             # Add verification history
             history = VerificationHistory(
@@ -756,14 +885,14 @@ async def get_kyc_status(current_user: dict = Depends(get_current_user)):
                 action="submitted",
                 performedBy="system",
                 reason="Initial profile created",
-                timestamp=datetime.now().isoformat()
+                timestamp=now_iso
             )
             kyc_profile.verificationHistory.append(history)
         
         return {
             "success": True,
             "data": kyc_profile.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except Exception as e:
@@ -776,10 +905,11 @@ async def submit_kyc_application(
 ):
     """Submit KYC application"""
     try:
-        user_id = current_user["id"]
+        now_iso = datetime.now().isoformat()
+        user_id = current_user["uid"]
         
         # Find or create KYC profile
-        kyc_profile = next((p for p in kyc_profiles if p.userId == user_id), None)
+        kyc_profile = kyc_by_user.get(user_id)
         
         if not kyc_profile:
             kyc_profile = KYCProfile(
@@ -791,15 +921,16 @@ async def submit_kyc_application(
                 addressInfo=request.addressInfo,
                 identityDocuments=[],
                 verificationHistory=[],
-                createdAt=datetime.now().isoformat(),
-                updatedAt=datetime.now().isoformat()
+                createdAt=now_iso,
+                updatedAt=now_iso
             )
             kyc_profiles.append(kyc_profile)
+            kyc_by_user[user_id] = kyc_profile
         else:
             # Update existing profile
             kyc_profile.personalInfo = request.personalInfo
             kyc_profile.addressInfo = request.addressInfo
-            kyc_profile.updatedAt = datetime.now().isoformat()
+            kyc_profile.updatedAt = now_iso
         
         # Process uploaded documents
         if request.documents:
@@ -826,7 +957,7 @@ async def submit_kyc_application(
             action="submitted",
             performedBy=user_id,
             reason="KYC application submitted",
-            timestamp=datetime.now().isoformat()
+            timestamp=now_iso
         )
         kyc_profile.verificationHistory.append(history)
         
@@ -838,16 +969,16 @@ async def submit_kyc_application(
                 action="review_started",
                 performedBy="system",
                 reason="Auto-review started after document submission",
-                timestamp=datetime.now().isoformat()
+                timestamp=now_iso
             )
             kyc_profile.verificationHistory.append(history)
         
-        kyc_profile.updatedAt = datetime.now().isoformat()
+        kyc_profile.updatedAt = now_iso
         
         return {
             "success": True,
             "data": kyc_profile.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except Exception as e:
@@ -860,11 +991,13 @@ async def update_kyc_status(
 ):
     """Update KYC status (admin only)"""
     try:
+        now = datetime.now()
+        now_iso = now.isoformat()
         admin_role = getattr(current_user, 'admin_role', None)
         if admin_role not in ['compliance_officer', 'admin']:
             raise HTTPException(status_code=403, detail="Admin privileges required for status updates")
         
-        kyc_profile = next((p for p in kyc_profiles if p.userId == request.targetUserId), None)
+        kyc_profile = kyc_by_user.get(request.targetUserId)
         
         if not kyc_profile:
             raise HTTPException(status_code=404, detail="KYC profile not found")
@@ -877,11 +1010,11 @@ async def update_kyc_status(
             if request.verificationLevel in ["basic", "intermediate", "advanced"]:
                 kyc_profile.verificationLevel = request.verificationLevel
         
-        kyc_profile.updatedAt = datetime.now().isoformat()
+        kyc_profile.updatedAt = now_iso
         
         # Set expiry date for approved profiles
         if request.status == "approved":
-            expiry_date = datetime.now()
+            expiry_date = now
             expiry_date = expiry_date.replace(year=expiry_date.year + 1)  # 1 year validity
             kyc_profile.expiresAt = expiry_date.isoformat()
         
@@ -889,16 +1022,16 @@ async def update_kyc_status(
         history = VerificationHistory(
             id=generate_id(),
             action=request.status,
-            performedBy=current_user["id"],
+            performedBy=current_user["uid"],
             reason=request.reviewNotes,
-            timestamp=datetime.now().isoformat()
+            timestamp=now_iso
         )
         kyc_profile.verificationHistory.append(history)
         
         return {
             "success": True,
             "data": kyc_profile.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -918,12 +1051,12 @@ async def delete_kyc_profile(
             raise HTTPException(status_code=403, detail="Admin privileges required for deletion")
         
         # Find and remove KYC profile
-        profile_index = next((i for i, p in enumerate(kyc_profiles) if p.userId == userId), None)
+        kyc_profile = kyc_by_user.pop(userId, None)
         
-        if profile_index is None:
+        if kyc_profile is None:
             raise HTTPException(status_code=404, detail="KYC profile not found")
         
-        kyc_profiles.pop(profile_index)
+        kyc_profiles.remove(kyc_profile)
         
         return {
             "success": True,
@@ -945,7 +1078,7 @@ async def get_compliance_dashboard(
 ):
     """Get compliance dashboard overview"""
     try:
-        user_id = current_user["id"]
+        user_id = current_user["uid"]
         admin_role = getattr(current_user, 'admin_role', None)
         
         if section == "overview":
@@ -1017,13 +1150,14 @@ async def get_dashboard_metrics(
 ):
     """Get detailed compliance metrics (admin only)"""
     try:
+        now_iso = datetime.now().isoformat()
         admin_role = getattr(current_user, 'admin_role', None)
         if admin_role not in ['compliance_officer', 'admin']:
             raise HTTPException(status_code=403, detail="Admin privileges required for detailed metrics")
         
         metrics = {
             "period": period,
-            "generatedAt": datetime.now().isoformat(),
+            "generatedAt": now_iso,
             "overview": {
                 "totalUsers": len(kyc_profiles),
                 "approvedUsers": len([k for k in kyc_profiles if k.status == "approved"]),
@@ -1034,7 +1168,7 @@ async def get_dashboard_metrics(
         return {
             "success": True,
             "data": metrics,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -1049,6 +1183,7 @@ async def create_dashboard_alert(
 ):
     """Create custom dashboard alert (admin only)"""
     try:
+        now_iso = datetime.now().isoformat()
         admin_role = getattr(current_user, 'admin_role', None)
         if admin_role not in ['compliance_officer', 'admin']:
             raise HTTPException(status_code=403, detail="Admin privileges required for creating alerts")
@@ -1062,7 +1197,7 @@ async def create_dashboard_alert(
             description=request.description,
             actionRequired=request.severity in ["critical", "high"],
             status="open",
-            createdAt=datetime.now().isoformat()
+            createdAt=now_iso
         )
         
         compliance_alerts.append(alert)
@@ -1070,7 +1205,7 @@ async def create_dashboard_alert(
         return {
             "success": True,
             "data": alert.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -1088,6 +1223,7 @@ async def update_dashboard_alert(
 ):
     """Update alert status (admin only)"""
     try:
+        now_iso = datetime.now().isoformat()
         admin_role = getattr(current_user, 'admin_role', None)
         if admin_role not in ['compliance_officer', 'admin']:
             raise HTTPException(status_code=403, detail="Admin privileges required for updating alerts")
@@ -1105,17 +1241,17 @@ async def update_dashboard_alert(
             alert.assignedTo = assignedTo
         
         if status in ["resolved", "closed"]:
-            alert.resolvedAt = datetime.now().isoformat()
+            alert.resolvedAt = now_iso
         
         if notes:
             alert.notes = notes
-            setattr(alert, "lastUpdatedBy", current_user["id"])
-            setattr(alert, "lastUpdatedAt", datetime.now().isoformat())
+            setattr(alert, "lastUpdatedBy", current_user["uid"])
+            setattr(alert, "lastUpdatedAt", now_iso)
         
         return {
             "success": True,
             "data": alert.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -1184,7 +1320,9 @@ async def generate_regulatory_report(
 ):
     """Generate new regulatory report"""
     try:
-        user_id = current_user["id"]
+        now = datetime.now()
+        now_iso = now.isoformat()
+        user_id = current_user["uid"]
         
         if request.reportType not in ["suspicious_activity", "large_transaction", "kyc_data", "compliance_summary", "risk_assessment"]:
             raise HTTPException(status_code=400, detail="Invalid report type")
@@ -1197,8 +1335,8 @@ async def generate_regulatory_report(
             "status": "draft",
             "data": request.data or {},
             "submittedBy": user_id,
-            "dueDate": (datetime.now() + timedelta(days=30)).isoformat(),
-            "createdAt": datetime.now().isoformat()
+            "dueDate": (now + timedelta(days=30)).isoformat(),
+            "createdAt": now_iso
         }
         
         regulatory_reports.append(report_data)
@@ -1206,7 +1344,7 @@ async def generate_regulatory_report(
         return {
             "success": True,
             "data": report_data,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -1222,6 +1360,7 @@ async def update_regulatory_report(
 ):
     """Update report status (admin only)"""
     try:
+        now_iso = datetime.now().isoformat()
         admin_role = getattr(current_user, 'admin_role', None)
         if admin_role not in ['compliance_officer', 'admin']:
             raise HTTPException(status_code=403, detail="Admin privileges required for updating reports")
@@ -1243,18 +1382,18 @@ async def update_regulatory_report(
         
         # Set submission timestamp when moving to submitted status
         if request.status == "submitted" and not report.get("submittedAt"):
-            report["submittedAt"] = datetime.now().isoformat()
+            report["submittedAt"] = now_iso
         
         # Add notes if provided
         if request.notes:
             report["data"]["notes"] = request.notes
-            report["data"]["lastUpdatedBy"] = current_user["id"]
-            report["data"]["lastUpdatedAt"] = datetime.now().isoformat()
+            report["data"]["lastUpdatedBy"] = current_user["uid"]
+            report["data"]["lastUpdatedAt"] = now_iso
         
         return {
             "success": True,
             "data": report,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -1266,6 +1405,8 @@ async def update_regulatory_report(
 async def auto_generate_reports(current_user: dict = Depends(get_current_user)):
     """Auto-generate reports (admin only)"""
     try:
+        now = datetime.now()
+        now_iso = now.isoformat()
         admin_role = getattr(current_user, 'admin_role', None)
         if admin_role not in ['compliance_officer', 'admin']:
             raise HTTPException(status_code=403, detail="Admin privileges required for auto-generating reports")
@@ -1285,8 +1426,8 @@ async def auto_generate_reports(current_user: dict = Depends(get_current_user)):
                     "status": "draft",
                     "data": {"relatedActivityId": activity.id},
                     "submittedBy": "System",
-                    "dueDate": (datetime.now() + timedelta(days=30)).isoformat(),
-                    "createdAt": datetime.now().isoformat()
+                    "dueDate": (now + timedelta(days=30)).isoformat(),
+                    "createdAt": now_iso
                 }
                 regulatory_reports.append(sar_report)
                 generated_count += 1
@@ -1294,7 +1435,7 @@ async def auto_generate_reports(current_user: dict = Depends(get_current_user)):
         return {
             "success": True,
             "data": {"generatedCount": generated_count},
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -1306,6 +1447,7 @@ async def auto_generate_reports(current_user: dict = Depends(get_current_user)):
 async def get_reporting_metrics(current_user: dict = Depends(get_current_user)):
     """Get reporting metrics (admin only)"""
     try:
+        now_iso = datetime.now().isoformat()
         admin_role = getattr(current_user, 'admin_role', None)
         if admin_role not in ['compliance_officer', 'admin']:
             raise HTTPException(status_code=403, detail="Admin privileges required for reporting metrics")
@@ -1335,13 +1477,13 @@ async def get_reporting_metrics(current_user: dict = Depends(get_current_user)):
                 "kycCompletionRate": 95
             },
             auditFindings=[],
-            calculatedAt=datetime.now().isoformat()
+            calculatedAt=now_iso
         )
         
         return {
             "success": True,
             "data": metrics.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -1363,7 +1505,7 @@ async def get_compliance_rules(
 ):
     """Get compliance rules"""
     try:
-        user_id = current_user["id"]
+        user_id = current_user["uid"]
         admin_role = getattr(current_user, 'admin_role', None)
         
         filtered_rules = compliance_rules.copy()
@@ -1421,6 +1563,7 @@ async def create_compliance_rule(
 ):
     """Create new compliance rule (admin only)"""
     try:
+        now_iso = datetime.now().isoformat()
         admin_role = getattr(current_user, 'admin_role', None)
         if admin_role not in ['compliance_officer', 'admin']:
             raise HTTPException(status_code=403, detail="Admin privileges required for creating rules")
@@ -1444,8 +1587,8 @@ async def create_compliance_rule(
             conditions=request.conditions,
             actions=request.actions,
             triggerCount=0,
-            createdAt=datetime.now().isoformat(),
-            updatedAt=datetime.now().isoformat()
+            createdAt=now_iso,
+            updatedAt=now_iso
         )
         
         compliance_rules.append(new_rule)
@@ -1453,7 +1596,7 @@ async def create_compliance_rule(
         return {
             "success": True,
             "data": new_rule.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -1469,6 +1612,7 @@ async def update_compliance_rule(
 ):
     """Update compliance rule (admin only)"""
     try:
+        now_iso = datetime.now().isoformat()
         admin_role = getattr(current_user, 'admin_role', None)
         if admin_role not in ['compliance_officer', 'admin']:
             raise HTTPException(status_code=403, detail="Admin privileges required for updating rules")
@@ -1494,12 +1638,12 @@ async def update_compliance_rule(
         if request.isActive is not None:
             rule.isActive = request.isActive
         
-        rule.updatedAt = datetime.now().isoformat()
+        rule.updatedAt = now_iso
         
         return {
             "success": True,
             "data": rule.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -1558,18 +1702,21 @@ async def evaluate_rule(
         conditions_met = [True] * len(rule.conditions)  # Simplified - assume all conditions met
         actions_executed = [{"action": action.dict(), "success": True} for action in rule.actions]
         
-        evaluation_time = (datetime.now() - evaluation_start_time).total_seconds() * 1000
+        # Evaluation end doubles as the timestamp for everything recorded below
+        now = datetime.now()
+        now_iso = now.isoformat()
+        evaluation_time = (now - evaluation_start_time).total_seconds() * 1000
         
         # Update rule trigger count
         rule.triggerCount += 1
-        rule.lastTriggered = datetime.now().isoformat()
-        rule.updatedAt = datetime.now().isoformat()
+        rule.lastTriggered = now_iso
+        rule.updatedAt = now_iso
         
         # Create execution result
         execution_result = RuleExecutionResult(
             id=generate_id(),
             ruleId=rule_id,
-            timestamp=datetime.now().isoformat(),
+            timestamp=now_iso,
             triggerData=request.triggerData,
             conditionsMet=conditions_met,
             actionsExecuted=actions_executed,
@@ -1582,7 +1729,7 @@ async def evaluate_rule(
         return {
             "success": True,
             "data": execution_result.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -1649,7 +1796,8 @@ async def search_sanctions_lists(
 ):
     """Search sanctions lists"""
     try:
-        user_id = current_user["id"]
+        now_iso = datetime.now().isoformat()
+        user_id = current_user["uid"]
         
         if not name:
             # Return all sanctions if no name provided (for admin viewing)
@@ -1691,16 +1839,15 @@ async def search_sanctions_lists(
             return {
                 "success": True,
                 "data": response,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso
             }
         
         # Search for specific name
-        exact_matches = [s for s in sanctions_lists if s.name.lower() == name.lower()]
+        exact_matches, partial_matches = match_names(sanctions_by_name, name)
         fuzzy_matches = [
             FuzzyMatch(entry=s.dict(), score=75) 
-            for s in sanctions_lists 
-            if s.name.lower() != name.lower() and name.lower() in s.name.lower()
-        ][:5]  # Limit to 5 fuzzy matches
+            for s in partial_matches[:5]  # Limit to 5 fuzzy matches
+        ]
         
         results = {
             "exactMatches": [match.dict() for match in exact_matches],
@@ -1712,7 +1859,7 @@ async def search_sanctions_lists(
         return {
             "success": True,
             "data": results,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -1727,22 +1874,26 @@ async def perform_sanctions_screening(
 ):
     """Perform comprehensive sanctions screening"""
     try:
-        user_id = current_user["id"]
+        now_iso = datetime.now().isoformat()
+        user_id = current_user["uid"]
         
         # Search all databases
+        sanctions_exact, sanctions_partial = match_names(sanctions_by_name, request.name)
         sanctions_results = {
-            "exactMatches": [s for s in sanctions_lists if s.name.lower() == request.name.lower()],
-            "fuzzyMatches": [FuzzyMatch(entry=s.dict(), score=75) for s in sanctions_lists if s.name.lower() != request.name.lower() and request.name.lower() in s.name.lower()][:5]
+            "exactMatches": sanctions_exact,
+            "fuzzyMatches": [FuzzyMatch(entry=s.dict(), score=75) for s in sanctions_partial[:5]]
         }
         
+        pep_exact, pep_partial = match_names(pep_by_name, request.name)
         pep_results = {
-            "exactMatches": [p for p in pep_database if p.name.lower() == request.name.lower()],
-            "fuzzyMatches": [FuzzyMatch(entry=p.dict(), score=70) for p in pep_database if p.name.lower() != request.name.lower() and request.name.lower() in p.name.lower()][:5]
+            "exactMatches": pep_exact,
+            "fuzzyMatches": [FuzzyMatch(entry=p.dict(), score=70) for p in pep_partial[:5]]
         }
         
+        watchlist_exact, watchlist_partial = match_names(watchlist_by_name, request.name)
         watchlist_results = {
-            "exactMatches": [w for w in watchlists if w.name.lower() == request.name.lower()],
-            "fuzzyMatches": [FuzzyMatch(entry=w.dict(), score=70) for w in watchlists if w.name.lower() != request.name.lower() and request.name.lower() in w.name.lower()][:5]
+            "exactMatches": watchlist_exact,
+            "fuzzyMatches": [FuzzyMatch(entry=w.dict(), score=70) for w in watchlist_partial[:5]]
         }
         
         # Determine overall risk
@@ -1755,7 +1906,7 @@ async def perform_sanctions_screening(
         # Create screening result
         screening_result = ScreeningResult(
             id=generate_id(),
-            timestamp=datetime.now().isoformat(),
+            timestamp=now_iso,
             queryName=request.name,
             queryType=request.queryType,
             results={
@@ -1785,13 +1936,13 @@ async def perform_sanctions_screening(
                 severity="high" if match.riskLevel == "critical" else match.riskLevel,
                 confidence=95,
                 actionTaken="Immediate escalation required" if match.riskLevel == "critical" else "Flagged for review",
-                timestamp=datetime.now().isoformat()
+                timestamp=now_iso
             ))
         
         return {
             "success": True,
             "data": {**screening_result.dict(), "findings": [f.dict() for f in findings]},
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except Exception as e:
@@ -1857,6 +2008,7 @@ async def update_screening_result(
 ):
     """Update screening result (admin only)"""
     try:
+        now_iso = datetime.now().isoformat()
         admin_role = getattr(current_user, 'admin_role', None)
         if admin_role not in ['compliance_officer', 'admin']:
             raise HTTPException(status_code=403, detail="Admin privileges required for updating screening results")
@@ -1873,13 +2025,13 @@ async def update_screening_result(
         if request.reviewerNotes:
             screening_result.reviewerNotes = request.reviewerNotes
         
-        screening_result.reviewedBy = current_user["id"]
-        screening_result.reviewedAt = datetime.now().isoformat()
+        screening_result.reviewedBy = current_user["uid"]
+        screening_result.reviewedAt = now_iso
         
         return {
             "success": True,
             "data": screening_result.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -1898,7 +2050,7 @@ async def get_transaction_monitoring(
 ):
     """Get transaction monitoring status"""
     try:
-        user_id = current_user["id"]
+        user_id = current_user["uid"]
         
         if transactionId:
             monitorings = [m for m in transaction_monitorings if m.transactionId == transactionId]
@@ -1947,7 +2099,8 @@ async def start_transaction_monitoring(
 ):
     """Start transaction monitoring"""
     try:
-        user_id = current_user["id"]
+        now_iso = datetime.now().isoformat()
+        user_id = current_user["uid"]
         
         if amount <= 0:
             raise HTTPException(status_code=400, detail="Transaction amount must be greater than zero")
@@ -2006,7 +2159,7 @@ async def start_transaction_monitoring(
             )),
             flags=flags,
             reviewed=False,
-            createdAt=datetime.now().isoformat()
+            createdAt=now_iso
         )
         
         transaction_monitorings.append(monitoring)
@@ -2028,7 +2181,7 @@ async def start_transaction_monitoring(
                 riskLevel="critical",
                 status="reported",
                 reportedBy="AML System",
-                reportedAt=datetime.now().isoformat(),
+                reportedAt=now_iso,
                 investigationNotes="Auto-generated critical risk alert based on transaction monitoring rules"
             )
             suspicious_activities.append(suspicious_activity)
@@ -2040,7 +2193,7 @@ async def start_transaction_monitoring(
         return {
             "success": True,
             "data": monitoring.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -2058,6 +2211,7 @@ async def update_monitoring_status(
 ):
     """Update monitoring status (admin only)"""
     try:
+        now_iso = datetime.now().isoformat()
         admin_role = getattr(current_user, 'admin_role', None)
         if admin_role not in ['compliance_officer', 'admin']:
             raise HTTPException(status_code=403, detail="Admin privileges required for updating monitoring status")
@@ -2075,7 +2229,7 @@ async def update_monitoring_status(
             monitoring.reviewedBy = reviewedBy
         
         if reviewed:
-            monitoring.reviewedAt = datetime.now().isoformat()
+            monitoring.reviewedAt = now_iso
         
         # If reviewing suspicious activity, update the related suspicious activity record
         if monitoring.status == "reported" and reviewed:
@@ -2092,7 +2246,7 @@ async def update_monitoring_status(
         return {
             "success": True,
             "data": monitoring.dict(),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
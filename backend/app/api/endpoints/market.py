@@ -8,7 +8,7 @@ import asyncio
 import random
 import aiohttp
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.schemas.trading import MarketPrice, MarketPricesResponse, OrderBookResponse, TradeHistoryResponse
@@ -40,15 +40,19 @@ CACHE_DURATION = 5  # seconds
 class MarketDataService:
     """Market data service with real API integration"""
     
-    def __init__(self):
-        self.session = None
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        # Shared session (app.state.http_session) keeps connections alive across requests;
+        # without one the service opens and closes its own
+        self.session = session
+        self._owns_session = session is None
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        if self._owns_session:
+            self.session = aiohttp.ClientSession()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self._owns_session and self.session:
             await self.session.close()
 
     async def fetch_with_timeout(self, url: str, timeout: int = 5, **kwargs) -> Optional[Dict]:
@@ -306,8 +310,13 @@ class MarketDataService:
         
         return trades
 
+def _http_session(request: Request) -> Optional[aiohttp.ClientSession]:
+    """Pooled HTTP session created in the app lifespan, None when running without it"""
+    return getattr(request.app.state, "http_session", None)
+
 @router.get("/prices", response_model=MarketPricesResponse)
 async def get_market_prices(
+    request: Request,
     symbol: Optional[str] = Query(None, description="Single symbol to fetch"),
     symbols: Optional[str] = Query(None, description="Comma-separated symbols"),
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -336,22 +345,20 @@ async def get_market_prices(
         
         prices_data = {}
         
-        # Fetch crypto prices
-        if crypto_symbols:
-            async with MarketDataService() as service:
+        async with MarketDataService(_http_session(request)) as service:
+            # Fetch crypto prices
+            if crypto_symbols:
                 crypto_prices = await service.get_crypto_prices(crypto_symbols)
                 prices_data.update(crypto_prices)
-        
-        # Fetch forex prices
-        if forex_symbols:
-            async with MarketDataService() as service:
+            
+            # Fetch forex prices
+            if forex_symbols:
                 forex_prices = await service.get_forex_prices(forex_symbols)
                 prices_data.update(forex_prices)
-        
-        # Add fallback data for missing symbols
-        for sym in symbols_to_fetch:
-            if sym not in prices_data:
-                async with MarketDataService() as service:
+            
+            # Add fallback data for missing symbols
+            for sym in symbols_to_fetch:
+                if sym not in prices_data:
                     prices_data[sym] = service.generate_fallback_data(sym)
         
         # Log data source usage
@@ -378,13 +385,14 @@ async def get_market_prices(
 
 @router.get("/orderbook/{symbol}", response_model=OrderBookResponse)
 async def get_order_book(
+    request: Request,
     symbol: str,
     limit: int = Query(20, ge=1, le=100, description="Number of levels to return"),
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """Get order book data for a symbol"""
     try:
-        async with MarketDataService() as service:
+        async with MarketDataService(_http_session(request)) as service:
             order_book_data = await service.get_order_book(symbol, limit)
             
             # Convert to response format
@@ -399,13 +407,14 @@ async def get_order_book(
 
 @router.get("/trade-history/{symbol}", response_model=TradeHistoryResponse)
 async def get_trade_history(
+    request: Request,
     symbol: str,
     limit: int = Query(50, ge=1, le=200, description="Number of trades to return"),
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """Get trade history for a symbol"""
     try:
-        async with MarketDataService() as service:
+        async with MarketDataService(_http_session(request)) as service:
             trades_data = await service.get_trade_history(symbol, limit)
             
             return TradeHistoryResponse(
@@ -27,6 +27,7 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api"
     # QUAN TRỌNG: Phải thay đổi SECRET_KEY trong production thông qua biến môi trường
     SECRET_KEY: str = "CHANGE-THIS-IN-PRODUCTION-USE-ENV-VAR"
+    # HMAC: token chỉ do chính service này ký và verify, nhanh hơn RS256/EdDSA
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
@@ -48,6 +49,9 @@ class Settings(BaseSettings):
         """Tạo URL kết nối PostgreSQL cho async"""
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
+    # Tạo async engine (asyncpg) trong lifespan; bật khi các endpoint dùng database thật
+    ASYNC_DB_ENABLED: bool = False
+    
     # =============== Cấu hình Redis ===============
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
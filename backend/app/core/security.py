@@ -7,13 +7,17 @@ Quản lý JWT tokens, password hashing, và các chức năng bảo mật
 
 from datetime import datetime, timedelta
 from typing import Optional, Any, Dict
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from passlib.context import CryptContext
 from .config import settings
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# JWT key object - dựng một lần, dùng lại cho mọi lần encode/decode
+# (truyền chuỗi secret khiến jose dựng lại key object ở mỗi lần gọi)
+_jwt_key = jwk.construct(settings.SECRET_KEY, settings.ALGORITHM)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -71,7 +75,7 @@ def create_access_token(
     
     encoded_jwt = jwt.encode(
         to_encode,
-        settings.SECRET_KEY,
+        _jwt_key,
         algorithm=settings.ALGORITHM
     )
     
@@ -107,7 +111,7 @@ def create_refresh_token(
     
     encoded_jwt = jwt.encode(
         to_encode,
-        settings.SECRET_KEY,
+        _jwt_key,
         algorithm=settings.ALGORITHM
     )
     
@@ -127,8 +131,10 @@ def verify_token(token: str) -> Optional[Dict[str, Any]]:
     try:
         payload = jwt.decode(
             token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
+            _jwt_key,
+            algorithms=[settings.ALGORITHM],
+            # Claims được kiểm tra ngay trong lần decode đã verify chữ ký
+            options={"require_exp": True}
         )
         return payload
     except JWTError:
@@ -0,0 +1,66 @@
+"""
+Async Database Session Management
+Digital Utopia Platform
+
+Engine async (asyncpg) cho các endpoint `async def`: tránh gọi driver blocking
+trong event loop. Engine được tạo một lần trong lifespan của ứng dụng, lưu trên
+app.state, và đóng khi shutdown.
+"""
+
+from typing import AsyncGenerator
+import logging
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine
+)
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# =============== Tạo Async Engine ===============
+def create_async_db_engine() -> AsyncEngine:
+    """
+    Tạo async engine với connection pool, cùng cấu hình pool với engine sync
+    Gọi trong lifespan startup; không tạo kết nối cho tới khi có query đầu tiên
+    """
+    engine = create_async_engine(
+        settings.DATABASE_URL_ASYNC,
+        pool_size=10,  # Số kết nối cơ bản trong pool
+        max_overflow=20,  # Số kết nối tối đa có thể tạo thêm
+        pool_timeout=30,  # Thời gian chờ kết nối (giây)
+        pool_recycle=1800,  # Tái tạo kết nối sau 30 phút
+        pool_pre_ping=True,  # Kiểm tra kết nối trước khi sử dụng
+        echo=settings.DEBUG,  # Log SQL queries trong debug mode
+    )
+    logger.info("Async database engine created")
+    return engine
+
+
+def create_async_sessionmaker(engine: AsyncEngine) -> async_sessionmaker:
+    """Tạo session factory cho async engine"""
+    return async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+
+# =============== Dependency Injection ===============
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency để inject async session vào endpoints
+
+    Sử dụng:
+        @router.get("/items")
+        async def get_items(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Item))
+            return result.scalars().all()
+
+    Các query độc lập cần chạy song song phải dùng session riêng
+    (một AsyncSession không hỗ trợ query đồng thời), ví dụ qua
+    request.app.state.db_engine.connect() cho mỗi query trong asyncio.gather.
+    """
+    async with request.app.state.db_sessionmaker() as session:
+        yield session
@@ -5,8 +5,10 @@ Authentication, rate limiting, and other middleware functions
 
 from .auth import (
     rate_limit,
+    rate_limit_multi,
     check_rate_limit,
     verify_token,
+    verify_token_async,
     create_access_token,
     get_current_user,
     get_current_user_optional,
@@ -25,7 +27,8 @@ from .auth import (
 
 __all__ = [
     # Middleware functions
-    "rate_limit", "check_rate_limit", "verify_token", "create_access_token",
+    "rate_limit", "rate_limit_multi", "check_rate_limit", "verify_token",
+    "verify_token_async", "create_access_token",
     "get_current_user", "get_current_user_optional", "get_client_ip",
     "extract_referral_token", "sign_in_with_email_and_password",
     "create_user_with_email_and_password", "sign_out", "revoke_refresh_token",
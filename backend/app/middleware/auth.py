@@ -5,24 +5,48 @@ Migration từ Next.js lib/middleware/auth và lib/middleware/rate-limit
 
 import os
 import time
+import logging
 import asyncio
-from typing import Optional, Dict, Any
-from fastapi import HTTPException, Request, status
+import secrets
+from functools import lru_cache
+from typing import Optional, Dict, Any, List
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 # import jwt
 # from jwt import PyJWTError
 from datetime import datetime, timedelta
-# import redis  # TODO: Enable when Redis is available
+from redis import asyncio as aioredis
 import json
 
+logger = logging.getLogger(__name__)
+
 # JWT Configuration
 JWT_SECRET = os.getenv("JWT_SECRET", "your-super-secret-jwt-key-change-in-production")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 1
 
-# Redis Configuration for rate limiting
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
-redis_client = None
+# Redis client for rate limiting - the shared app.state.redis, attached in lifespan
+redis_client: Optional[aioredis.Redis] = None
+_sliding_window_script = None
+
+# Sliding window: bỏ các request cũ hơn window, đếm phần còn lại; chỉ ghi request mới
+# vào mọi bucket khi tất cả còn quota. Trả về số thứ tự bucket đã hết quota, 0 nếu cho phép
+# KEYS = rl:{endpoint}:{client_ip}...; ARGV = now, member, rồi window, limit cho từng key
+SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, 0, now - tonumber(ARGV[i * 2 + 1]))
+    if redis.call('ZCARD', key) >= tonumber(ARGV[i * 2 + 2]) then
+        return i
+    end
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[2])
+    redis.call('EXPIRE', key, ARGV[i * 2 + 1])
+end
+return 0
+"""
 
 # Rate limiting configuration
 RATE_LIMITS = {
@@ -62,97 +86,94 @@ class TokenValidationError(HTTPException):
 
 # ========== RATE LIMITING FUNCTIONS ==========
 
-async def init_redis():
-    """Initialize Redis connection"""
-    global redis_client
-    if redis_client is None:
-        try:
-            # redis_client = redis.from_url(REDIS_URL, decode_responses=True)  # TODO: Enable when Redis is available
-            # Test connection
-            # await redis_client.ping()  # TODO: Enable when Redis is available
-            redis_client = None  # Disable Redis for now
-        except Exception as e:
-            print(f"Warning: Redis connection failed: {e}")
-            redis_client = None
+def init_redis(client: Optional[aioredis.Redis]) -> None:
+    """
+    Attach the shared Redis client used for rate limiting
+    None (memory-only mode) disables rate limiting
+    """
+    global redis_client, _sliding_window_script
+    redis_client = client
+    _sliding_window_script = client.register_script(SLIDING_WINDOW_LUA) if client is not None else None
+
+def _rate_limit_key(endpoint: str, client_ip: str) -> str:
+    return f"rl:{endpoint}:{client_ip}"
 
 async def rate_limit(client_ip: str, endpoint: str) -> None:
     """
     Rate limiting function - tương tự Next.js rateLimit
     """
-    await init_redis()
-    
+    await rate_limit_multi(client_ip, [endpoint])
+
+async def rate_limit_multi(client_ip: str, endpoints: List[str]) -> None:
+    """
+    Rate limit nhiều bucket trong một lần EVAL
+    Sliding window trên Redis sorted set, kiểm tra và ghi nhận nguyên tử
+    nên giới hạn được áp dụng chung cho mọi worker
+    """
     if redis_client is None:
         # Skip rate limiting if Redis is not available
         return
     
+    # Get rate limit config
+    configs = [RATE_LIMITS.get(endpoint, RATE_LIMITS["general"]) for endpoint in endpoints]
+    args = [time.time(), secrets.token_hex(8)]
+    for config in configs:
+        args += [config["window"], config["requests"]]
+    
     try:
-        # Get rate limit config
-        config = RATE_LIMITS.get(endpoint, RATE_LIMITS["general"])
-        max_requests = config["requests"]
-        window_seconds = config["window"]
-        
-        # Create Redis key
-        key = f"rate_limit:{endpoint}:{client_ip}"
-        
-        # Get current request count
-        current_requests = await redis_client.get(key)
-        
-        if current_requests is None:
-            # First request in window
-            await redis_client.setex(key, window_seconds, 1)
-        else:
-            current_requests = int(current_requests)
-            
-            if current_requests >= max_requests:
-                # Rate limit exceeded
-                raise RateLimitError(
-                    detail=f"Quá nhiều yêu cầu. Vui lòng thử lại sau {window_seconds // 60} phút."
-                )
-            
-            # Increment counter
-            await redis_client.incr(key)
-        
-        return True
-        
-    except RateLimitError:
-        raise
-    except Exception as e:
-        print(f"Rate limiting error: {e}")
+        exceeded = await _sliding_window_script(
+            keys=[_rate_limit_key(endpoint, client_ip) for endpoint in endpoints],
+            args=args,
+        )
+    except Exception:
+        logger.warning("Rate limiting error", exc_info=True)
         # Continue if rate limiting fails
-        return True
+        return
+    
+    if exceeded:
+        # Rate limit exceeded
+        window_seconds = configs[exceeded - 1]["window"]
+        raise RateLimitError(
+            detail=f"Quá nhiều yêu cầu. Vui lòng thử lại sau {window_seconds // 60} phút."
+        )
 
 async def check_rate_limit(client_ip: str, endpoint: str) -> Dict[str, Any]:
     """
     Check current rate limit status
     """
-    await init_redis()
+    config = RATE_LIMITS.get(endpoint, RATE_LIMITS["general"])
     
     if redis_client is None:
         return {
             "current_requests": 0,
-            "max_requests": RATE_LIMITS.get(endpoint, RATE_LIMITS["general"])["requests"],
-            "window_seconds": RATE_LIMITS.get(endpoint, RATE_LIMITS["general"])["window"],
+            "max_requests": config["requests"],
+            "window_seconds": config["window"],
         }
     
     try:
-        config = RATE_LIMITS.get(endpoint, RATE_LIMITS["general"])
-        key = f"rate_limit:{endpoint}:{client_ip}"
+        key = _rate_limit_key(endpoint, client_ip)
+        now = time.time()
         
-        current_requests = await redis_client.get(key)
-        current_requests = int(current_requests) if current_requests else 0
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.zcount(key, now - config["window"], "+inf")
+            pipe.zrangebyscore(key, now - config["window"], "+inf", start=0, num=1, withscores=True)
+            current_requests, oldest = await pipe.execute()
         
-        ttl = await redis_client.ttl(key)
+        # Quota tiếp theo được trả lại khi request cũ nhất trong window hết hạn
+        reset_in_seconds = config["window"]
+        if oldest:
+            reset_in_seconds = max(0, int(oldest[0][1] + config["window"] - now))
         
         return {
             "current_requests": current_requests,
             "max_requests": config["requests"],
             "window_seconds": config["window"],
             "remaining_requests": max(0, config["requests"] - current_requests),
-            "reset_in_seconds": max(0, ttl) if ttl > 0 else config["window"]
+            "reset_in_seconds": reset_in_seconds
         }
         
-    except Exception as e:
-        print(f"Rate limit check error: {e}")
+    except Exception:
+        logger.warning("Rate limit check error", exc_info=True)
         return {
             "current_requests": 0,
             "max_requests": config["requests"],
@@ -185,9 +206,11 @@ def create_access_token(user_data: Dict[str, Any]) -> str:
     # return token
     return f"mock_token_{payload.get('uid', 'unknown')}"  # Mock token for development
 
-def verify_token(token: str) -> Dict[str, Any]:
+@lru_cache(maxsize=4096)
+def _decode_token(token: str) -> Dict[str, Any]:
     """
-    Verify JWT token - Mock version for development
+    Decode và verify chữ ký token, cache theo chuỗi token
+    Token lỗi raise exception nên không bao giờ được cache
     """
     # Mock verification - accept any token in development
     if not token:
@@ -202,9 +225,29 @@ def verify_token(token: str) -> Dict[str, Any]:
         "aud": "digital-utopia-client"
     }
 
+def verify_token(token: str) -> Dict[str, Any]:
+    """
+    Verify JWT token - Mock version for development
+    Chữ ký chỉ được verify một lần cho mỗi token; hạn dùng vẫn kiểm tra mỗi lần gọi
+    """
+    payload = _decode_token(token)
+    
+    exp = payload.get("exp")
+    if exp is not None and exp <= time.time():
+        raise TokenValidationError("Token đã hết hạn")
+    
+    # Copy so callers cannot mutate the cached payload
+    return dict(payload)
+
+async def verify_token_async(token: str) -> Dict[str, Any]:
+    """
+    verify_token chạy trong threadpool để việc verify chữ ký không chặn event loop
+    """
+    return await run_in_threadpool(verify_token, token)
+
 # ========== AUTHENTICATION HELPERS ==========
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = security) -> Dict[str, Any]:
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """
     Get current authenticated user - tương tự Next.js auth middleware
     """
@@ -235,7 +278,7 @@ async def get_current_user_optional(request: Request) -> Optional[Dict[str, Any]
         if not auth_header or not auth_header.startswith("Bearer "):
             return None
         
-        token = auth_header.split(" ")[1]
+        token = auth_header[7:]
         payload = verify_token(token)
         
         return {
@@ -255,7 +298,16 @@ async def get_current_user_optional(request: Request) -> Optional[Dict[str, Any]
 def get_client_ip(request: Request) -> str:
     """
     Get client IP address - tương tự Next.js
+    Kết quả được lưu trên request.state.client_ip cho các lần gọi sau trong cùng request
     """
+    client_ip = getattr(request.state, "client_ip", None)
+    if client_ip is None:
+        client_ip = _parse_client_ip(request)
+        request.state.client_ip = client_ip
+    return client_ip
+
+def _parse_client_ip(request: Request) -> str:
+    """Đọc IP từ header proxy, fallback về địa chỉ kết nối"""
     # Check for forwarded headers first (for proxies/load balancers)
     forwarded_for = request.headers.get("x-forwarded-for")
     if forwarded_for:
@@ -354,24 +406,21 @@ async def send_email(email_data: Dict[str, Any]) -> bool:
     """
     # TODO: Implement SendGrid integration
     # Placeholder implementation
-    print(f"Sending email to {email_data.get('to')}")
-    print(f"Subject: {email_data.get('subject')}")
-    print(f"Template: {email_data.get('template')}")
-    print(f"Data: {email_data.get('data')}")
+    logger.info(
+        "Sending email to %s: %s (template %s)",
+        email_data.get("to"), email_data.get("subject"), email_data.get("template")
+    )
+    logger.debug("Email data: %s", email_data.get("data"))
     return True
 
 # ========== UTILITY FUNCTIONS ==========
 
 async def cleanup_redis_connections():
-    """Cleanup Redis connections"""
-    global redis_client
-    if redis_client:
-        try:
-            await redis_client.close()
-        except Exception as e:
-            print(f"Redis cleanup error: {e}")
-        finally:
-            redis_client = None
+    """
+    Detach the rate limiting Redis client
+    The connection itself belongs to app.state.redis and is closed by the lifespan
+    """
+    init_redis(None)
 
 def get_error_message(error: Exception, error_type: str = "general") -> str:
     """
@@ -437,3 +486,40 @@ def require_admin_role(decoded_token: Dict[str, Any]) -> bool:
     return user_role in admin_roles
     
     return str(error) if str(error) else "Đã xảy ra lỗi không xác định"
+
+
+async def require_admin(request: Request) -> Dict[str, Any]:
+    """
+    FastAPI dependency: xác thực Bearer token và yêu cầu quyền admin
+    Decoded token được lưu trên request.state.decoded_token để các dependency khác dùng lại
+    """
+    decoded_token = getattr(request.state, "decoded_token", None)
+    if decoded_token is None:
+        decoded_token = _verify_request_token(request)
+        request.state.decoded_token = decoded_token
+
+    if not require_admin_role(decoded_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cần quyền admin để truy cập"
+        )
+
+    return decoded_token
+
+
+def _verify_request_token(request: Request) -> Dict[str, Any]:
+    """Đọc Bearer token từ header và verify, raise 401 nếu thiếu hoặc không hợp lệ"""
+    auth_header = request.headers.get("authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Không tìm thấy token xác thực"
+        )
+
+    try:
+        return verify_token(auth_header[7:])
+    except TokenValidationError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token không hợp lệ"
+        )
@@ -0,0 +1,49 @@
+"""
+Cache ngắn hạn cho kết quả verify token
+Dùng cho các endpoint auth gọi verify token trên mỗi request (verify, logout, refresh)
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from .auth import verify_token_async
+
+# Token cache configuration
+TOKEN_CACHE_TTL = 5  # giây
+TOKEN_CACHE_MAX_SIZE = 10_000
+
+# token -> (payload, expires_at); OrderedDict giữ thứ tự LRU
+# Key là toàn bộ token: hai token khác nhau không bao giờ dùng chung kết quả verify
+_token_cache: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+
+async def verify_token_cached(token: str) -> Dict[str, Any]:
+    """
+    Verify token với cache TTL ngắn - cùng kết quả và exception như verify_token
+    Chỉ cache token hợp lệ; entry hết hạn sau TTL hoặc khi token hết hạn, tùy cái nào sớm hơn
+    Cache hit trả về ngay trên event loop; cache miss verify trong threadpool
+    """
+    now = time.time()
+
+    entry = _token_cache.get(token)
+    if entry is not None:
+        payload, expires_at = entry
+        if expires_at > now:
+            _token_cache.move_to_end(token)
+            return dict(payload)
+        del _token_cache[token]
+
+    # Token lỗi raise exception ở đây nên không bao giờ được cache
+    payload = await verify_token_async(token)
+
+    expires_at = now + TOKEN_CACHE_TTL
+    exp = payload.get("exp")
+    if exp is not None:
+        expires_at = min(expires_at, exp)
+
+    _token_cache[token] = (payload, expires_at)
+    if len(_token_cache) > TOKEN_CACHE_MAX_SIZE:
+        _token_cache.popitem(last=False)
+
+    return dict(payload)
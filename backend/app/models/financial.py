@@ -7,7 +7,7 @@ Models cho Transactions, Wallet Balances, và Exchange Rates
 
 from sqlalchemy import (
     Column, Integer, String, Boolean, DateTime, Text, 
-    ForeignKey, DECIMAL, UniqueConstraint
+    ForeignKey, DECIMAL, UniqueConstraint, Index
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB, INET
@@ -69,6 +69,14 @@ class Transaction(Base, TimestampMixin):
     cancelled_at = Column(DateTime(timezone=True), nullable=True)
     failed_reason = Column(Text, nullable=True)
     
+    # Index cho lịch sử giao dịch: lọc theo user, sắp xếp created_at DESC + LIMIT/OFFSET
+    # (B-tree quét ngược được nên không cần khai báo DESC)
+    __table_args__ = (
+        Index('ix_transactions_user_id_created_at', 'user_id', 'created_at'),
+        Index('ix_transactions_user_id_type', 'user_id', 'transaction_type'),
+        Index('ix_transactions_user_id_status', 'user_id', 'status'),
+    )
+
     # Relationships
     user = relationship("User", back_populates="transactions")
     
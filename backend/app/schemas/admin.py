@@ -94,7 +94,6 @@ class UserResponse(BaseModel):
     success: bool = Field(..., description="Operation success status")
     message: Optional[str] = Field(None, description="Success message")
     data: Optional[Dict[str, Any]] = Field(None, description="Response data")
-    updatedFields: Optional[List[str]] = Field(None, description="Updated fields")
 
 
 # ========== CUSTOMER MANAGEMENT SCHEMAS ==========
@@ -6,7 +6,7 @@ Iceberg Orders, OCO Orders, và Trailing Stop Orders
 from datetime import datetime
 from typing import Optional, List, Dict, Any, Union
 from enum import Enum
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, computed_field, validator
 import uuid
 
 
@@ -109,14 +109,46 @@ class UpdateIcebergOrderRequest(BaseModel):
 # ========== OCO ORDERS ==========
 
 class OcoOrder(BaseModel):
-    """OCO (One-Cancels-Other) Order Model"""
+    """
+    OCO (One-Cancels-Other) Order Model
+    
+    Hai lệnh take profit / stop loss lưu dạng field phẳng; JSON vẫn trả về
+    dạng lồng nhau qua computed field `orders`
+    """
     orderId: str = Field(..., description="Unique order ID")
     userId: str = Field(..., description="User ID")
     symbol: str = Field(..., description="Trading symbol")
-    orders: Dict[str, Dict[str, Any]] = Field(..., description="Take profit và stop loss orders")
+    side: OrderSide = Field(..., exclude=True, description="BUY or SELL (cả hai lệnh)")
+    quantity: float = Field(..., exclude=True, description="Order quantity (cả hai lệnh)")
+    takeProfitOrderId: str = Field(..., exclude=True, description="Take profit order ID")
+    takeProfitPrice: float = Field(..., exclude=True, description="Take profit price")
+    takeProfitStatus: OrderStatus = Field(default=OrderStatus.PENDING, exclude=True)
+    stopLossOrderId: str = Field(..., exclude=True, description="Stop loss order ID")
+    stopLossPrice: float = Field(..., exclude=True, description="Stop loss price")
+    stopLossStatus: OrderStatus = Field(default=OrderStatus.PENDING, exclude=True)
     status: OrderStatus = Field(default=OrderStatus.ACTIVE)
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
+    
+    @computed_field(description="Take profit và stop loss orders")
+    @property
+    def orders(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            "takeProfit": {
+                "orderId": self.takeProfitOrderId,
+                "side": self.side,
+                "price": self.takeProfitPrice,
+                "quantity": self.quantity,
+                "status": self.takeProfitStatus
+            },
+            "stopLoss": {
+                "orderId": self.stopLossOrderId,
+                "side": self.side,
+                "price": self.stopLossPrice,
+                "quantity": self.quantity,
+                "status": self.stopLossStatus
+            }
+        }
 
 
 class CreateOcoOrderRequest(BaseModel):
@@ -258,20 +290,12 @@ def get_mock_oco_orders() -> List[OcoOrder]:
             orderId="OCO_001",
             userId="user_001",
             symbol="ETHUSDT",
-            orders={
-                "takeProfit": {
-                    "orderId": "TP_001",
-                    "side": OrderSide.BUY,
-                    "price": 3200.0,
-                    "status": OrderStatus.PENDING
-                },
-                "stopLoss": {
-                    "orderId": "SL_001",
-                    "side": OrderSide.BUY,
-                    "price": 2900.0,
-                    "status": OrderStatus.PENDING
-                }
-            },
+            side=OrderSide.BUY,
+            quantity=1.0,
+            takeProfitOrderId="TP_001",
+            takeProfitPrice=3200.0,
+            stopLossOrderId="SL_001",
+            stopLossPrice=2900.0,
             status=OrderStatus.ACTIVE
         )
     ]
@@ -171,6 +171,9 @@ class AMLScreeningRequest(BaseModel):
     transactionData: Optional[Dict[str, Any]] = None
     enhancedDueDiligence: bool = Field(default=False)
 
+class AMLBatchScreeningItem(AMLScreeningRequest):
+    userId: str = Field(..., description="User được sàng lọc")
+
 class AMLMonitoringRequest(BaseModel):
     transactionId: str
     amount: float = Field(..., gt=0)
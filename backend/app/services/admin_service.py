@@ -6,8 +6,8 @@ Business logic cho Admin operations
 """
 
 from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import and_, desc, func, select, true
 from datetime import datetime, timedelta
 import logging
 
@@ -66,17 +66,40 @@ class AdminService:
         Returns:
             Dict với users và pagination info
         """
-        query = self.db.query(User)
-        
+        filters = []
         if status:
-            query = query.filter(User.status == status)
+            filters.append(User.status == status)
         if role_id:
-            query = query.filter(User.role_id == role_id)
+            filters.append(User.role_id == role_id)
         if search:
-            query = query.filter(User.email.ilike(f"%{search}%"))
+            filters.append(User.email.ilike(f"%{search}%"))
+        
+        # Page và total trong một round trip: COUNT(*) OVER() đếm toàn bộ
+        # kết quả đã lọc trước khi LIMIT/OFFSET được áp dụng.
+        # Role và profile (quan hệ 1-1) được LEFT JOIN luôn để tránh N+1 query;
+        # wallet balances của cả trang được nạp bằng một query IN duy nhất.
+        rows = (
+            self.db.query(User, func.count().over().label("total"))
+            .filter(*filters)
+            .options(
+                joinedload(User.role),
+                joinedload(User.profile),
+                selectinload(User.wallet_balances)
+            )
+            .order_by(desc(User.created_at))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        users = [row.User for row in rows]
         
-        total = query.count()
-        users = query.order_by(desc(User.created_at)).offset(skip).limit(limit).all()
+        if rows:
+            total = rows[0].total
+        elif skip:
+            # Trang vượt quá dữ liệu: không có dòng nào mang window count
+            total = self.db.query(func.count(User.id)).filter(*filters).scalar()
+        else:
+            total = 0
         
         return {
             "users": users,
@@ -183,54 +206,62 @@ class AdminService:
             if cached:
                 return cached
         
-        # User stats
-        total_users = self.db.query(User).count()
-        active_users = self.db.query(User).filter(User.status == "active").count()
-        verified_users = self.db.query(User).filter(User.kyc_status == "verified").count()
-        
-        # Get users registered today
         today = datetime.utcnow().date()
-        new_users_today = self.db.query(User).filter(
-            func.date(User.created_at) == today
-        ).count()
-        
-        # Trading stats
-        total_orders = self.db.query(TradingOrder).count()
-        pending_orders = self.db.query(TradingOrder).filter(
-            TradingOrder.status == "pending"
-        ).count()
-        
-        # Financial stats
-        total_transactions = self.db.query(Transaction).count()
-        pending_withdrawals = self.db.query(Transaction).filter(
-            and_(
-                Transaction.transaction_type == "withdrawal",
-                Transaction.status == "pending"
-            )
-        ).count()
         
-        # Compliance stats
-        open_compliance_events = self.db.query(ComplianceEvent).filter(
-            ComplianceEvent.status == "open"
-        ).count()
+        # Mỗi bảng được quét một lần, các bộ đếm dùng COUNT(*) FILTER (WHERE ...);
+        # bốn subquery một dòng được ghép lại để lấy tất cả trong một round trip
+        user_stats = select(
+            func.count().label("total"),
+            func.count().filter(User.status == "active").label("active"),
+            func.count().filter(User.kyc_status == "verified").label("verified"),
+            func.count().filter(func.date(User.created_at) == today).label("new_today")
+        ).select_from(User).subquery()
+        
+        trading_stats = select(
+            func.count().label("total_orders"),
+            func.count().filter(TradingOrder.status == "pending").label("pending_orders")
+        ).select_from(TradingOrder).subquery()
+        
+        financial_stats = select(
+            func.count().label("total_transactions"),
+            func.count().filter(
+                and_(
+                    Transaction.transaction_type == "withdrawal",
+                    Transaction.status == "pending"
+                )
+            ).label("pending_withdrawals")
+        ).select_from(Transaction).subquery()
+        
+        compliance_stats = select(
+            func.count().label("open_events")
+        ).select_from(ComplianceEvent).where(ComplianceEvent.status == "open").subquery()
+        
+        row = self.db.execute(
+            select(user_stats, trading_stats, financial_stats, compliance_stats).select_from(
+                user_stats
+                .join(trading_stats, true())
+                .join(financial_stats, true())
+                .join(compliance_stats, true())
+            )
+        ).one()
         
         stats = {
             "users": {
-                "total": total_users,
-                "active": active_users,
-                "verified": verified_users,
-                "new_today": new_users_today
+                "total": row.total,
+                "active": row.active,
+                "verified": row.verified,
+                "new_today": row.new_today
             },
             "trading": {
-                "total_orders": total_orders,
-                "pending_orders": pending_orders
+                "total_orders": row.total_orders,
+                "pending_orders": row.pending_orders
             },
             "financial": {
-                "total_transactions": total_transactions,
-                "pending_withdrawals": pending_withdrawals
+                "total_transactions": row.total_transactions,
+                "pending_withdrawals": row.pending_withdrawals
             },
             "compliance": {
-                "open_events": open_compliance_events
+                "open_events": row.open_events
             },
             "timestamp": datetime.utcnow().isoformat()
         }
@@ -251,53 +282,64 @@ class AdminService:
         Returns:
             Dict với các thống kê
         """
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return {}
-        
-        # Trading stats
-        total_orders = self.db.query(TradingOrder).filter(
-            TradingOrder.user_id == user_id
-        ).count()
-        
-        filled_orders = self.db.query(TradingOrder).filter(
-            and_(
-                TradingOrder.user_id == user_id,
-                TradingOrder.status == "filled"
-            )
-        ).count()
-        
-        # Position stats
-        open_positions = self.db.query(PortfolioPosition).filter(
+        # Các thống kê độc lập được gom thành các subquery một dòng và ghép
+        # vào dòng user, nên toàn bộ dữ liệu chỉ cần một round trip
+        order_stats = select(
+            func.count().label("total_orders"),
+            func.count().filter(TradingOrder.status == "filled").label("filled_orders")
+        ).where(TradingOrder.user_id == user_id).subquery()
+        
+        position_stats = select(
+            func.count().label("open_positions")
+        ).where(
             and_(
                 PortfolioPosition.user_id == user_id,
                 PortfolioPosition.is_closed == False
             )
-        ).count()
-        
-        # Balance stats
-        balances = self.db.query(WalletBalance).filter(
-            WalletBalance.user_id == user_id
-        ).all()
-        
-        total_balance = sum(float(b.available_balance or 0) + float(b.locked_balance or 0) for b in balances)
-        
-        # Transaction stats
-        deposits = self.db.query(func.sum(Transaction.amount)).filter(
+        ).subquery()
+        
+        balance_stats = select(
+            func.sum(
+                func.coalesce(WalletBalance.available_balance, 0)
+                + func.coalesce(WalletBalance.locked_balance, 0)
+            ).label("total_balance")
+        ).where(WalletBalance.user_id == user_id).subquery()
+        
+        transaction_stats = select(
+            func.sum(Transaction.amount).filter(
+                Transaction.transaction_type == "deposit"
+            ).label("deposits"),
+            func.sum(Transaction.amount).filter(
+                Transaction.transaction_type == "withdrawal"
+            ).label("withdrawals")
+        ).where(
             and_(
                 Transaction.user_id == user_id,
-                Transaction.transaction_type == "deposit",
                 Transaction.status == "completed"
             )
-        ).scalar() or 0
+        ).subquery()
         
-        withdrawals = self.db.query(func.sum(Transaction.amount)).filter(
-            and_(
-                Transaction.user_id == user_id,
-                Transaction.transaction_type == "withdrawal",
-                Transaction.status == "completed"
+        user = self.db.execute(
+            select(
+                User.email, User.status, User.kyc_status,
+                order_stats, position_stats, balance_stats, transaction_stats
             )
-        ).scalar() or 0
+            .select_from(User)
+            .join(order_stats, true())
+            .join(position_stats, true())
+            .join(balance_stats, true())
+            .join(transaction_stats, true())
+            .where(User.id == user_id)
+        ).first()
+        if not user:
+            return {}
+        
+        total_orders = user.total_orders
+        filled_orders = user.filled_orders
+        open_positions = user.open_positions
+        total_balance = float(user.total_balance or 0)
+        deposits = user.deposits or 0
+        withdrawals = user.withdrawals or 0
         
         return {
             "user_id": user_id,
@@ -15,9 +15,18 @@ from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 import uvicorn
+import aiohttp
 import logging
+import os
+import queue
 import time
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional, Tuple
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
 
 # Configure logging
 logging.basicConfig(
@@ -26,13 +35,84 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def start_log_listener() -> Tuple[QueueListener, List[logging.Handler]]:
+    """
+    Route root log records through a queue so request handlers only enqueue;
+    a background listener thread does the formatting and stream I/O.
+    Returns the listener and the root handlers it replaced, to restore on shutdown.
+    """
+    root_logger = logging.getLogger()
+    original_handlers = list(root_logger.handlers)
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *original_handlers, respect_handler_level=True)
+    root_logger.handlers = [QueueHandler(log_queue)]
+    listener.start()
+    return listener, original_handlers
+
+def stop_log_listener(listener: QueueListener, original_handlers: List[logging.Handler]) -> None:
+    """Drain the log queue and put the original root handlers back"""
+    listener.stop()
+    logging.getLogger().handlers = original_handlers
+
+async def connect_redis() -> Optional[aioredis.Redis]:
+    """
+    Create the shared async Redis client used for response caching.
+    Returns None (memory-only mode) when Redis is unreachable.
+    """
+    client = aioredis.from_url(settings.REDIS_URL, socket_timeout=5, socket_connect_timeout=5)
+    try:
+        await client.ping()
+    except RedisError as e:
+        logger.warning(f"Could not connect to Redis: {e}. Running in memory-only mode.")
+        await client.aclose()
+        return None
+    logger.info(f"Connected to Redis at {settings.REDIS_HOST}:{settings.REDIS_PORT}")
+    return client
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
+    log_listener, original_log_handlers = start_log_listener()
     logger.info("🚀 Digital Utopia Platform FastAPI Backend Starting...")
     
+    # Order books and mock data live in process memory: a second worker would
+    # serve a different copy (see WEB_CONCURRENCY in the Dockerfile)
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    if workers > 1:
+        logger.warning(
+            "WEB_CONCURRENCY=%d but in-memory order storage is per process; "
+            "orders created on one worker are not visible to the others",
+            workers
+        )
+    
     # Initialize database connections
+    # One async pool per worker, shared by every request via app.state
+    app.state.db_engine = None
+    if settings.ASYNC_DB_ENABLED:
+        from app.db.async_session import create_async_db_engine, create_async_sessionmaker
+        app.state.db_engine = create_async_db_engine()
+        app.state.db_sessionmaker = create_async_sessionmaker(app.state.db_engine)
+    app.state.redis = await connect_redis()
+    
+    # One pooled HTTP client per worker for outbound API calls (market data),
+    # so requests reuse keep-alive connections instead of a new TLS handshake each
+    app.state.http_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+    )
+    
+    # Rate limiting on the auth endpoints shares the same Redis connection
+    from app.middleware.auth import init_redis, cleanup_redis_connections
+    init_redis(app.state.redis)
+    
+    # Serialize the shared exchange-rates response now rather than on the first request
+    from app.api.endpoints.client import refresh_exchange_rates_cache
+    refresh_exchange_rates_cache()
+    
+    # Generate the OpenAPI document (JSON schema of every request/response
+    # model) up front so the first /docs or /openapi.json hit does not pay for it
+    app.openapi()
+    
     # Setup authentication
     # Load configuration
     
@@ -40,6 +120,13 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("🛑 Digital Utopia Platform FastAPI Backend Shutting Down...")
+    if app.state.db_engine is not None:
+        await app.state.db_engine.dispose()
+    await app.state.http_session.close()
+    await cleanup_redis_connections()
+    if app.state.redis is not None:
+        await app.state.redis.aclose()
+    stop_log_listener(log_listener, original_log_handlers)
 
 # Create FastAPI application
 app = FastAPI(
@@ -62,7 +149,8 @@ app.add_middleware(
 )
 
 # GZip Middleware
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Level 1 keeps per-response CPU low; JSON lists still shrink several-fold
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=1)
 
 # Static Files
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -105,44 +193,10 @@ async def health_check():
         "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
     }
 
-# Import and register API routers
-from app.api.endpoints import auth, client, admin, financial, trading, market, portfolio, compliance, risk_management, staff_referrals, users, advanced_trading
-
-# Phase 1: Authentication endpoints (migrated from Next.js)
-app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
-
-# Phase 1: Client endpoints (migrated from Next.js)
-app.include_router(client.router, prefix="/api/client", tags=["client"])
-
-# Phase 1: Admin endpoints (migrated from Next.js)
-app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
-
-# Phase 1: Financial endpoints (migrated from Next.js)
-app.include_router(financial.router, prefix="/api/financial", tags=["financial"])
-
-# Phase 1: Trading endpoints (migrated from Next.js)
-app.include_router(trading.router, prefix="/api/trading", tags=["trading"])
-
-# Phase 1: Market data endpoints (migrated from Next.js)
-app.include_router(market.router, prefix="/api/market", tags=["market"])
-
-# Phase 1: Portfolio endpoints (migrated from Next.js)
-app.include_router(portfolio.router, prefix="/api/portfolio", tags=["portfolio"])
-
-# Phase 1: Compliance endpoints (migrated from Next.js)
-app.include_router(compliance.router, prefix="/api/compliance", tags=["compliance"])
-
-# Phase 1: Risk Management endpoints (migrated from Next.js)
-app.include_router(risk_management.router, prefix="/api/risk-management", tags=["risk-management"])
-
-# Phase 1: Staff Referral Management endpoints (migrated from Next.js)
-app.include_router(staff_referrals.router, prefix="/api/staff", tags=["staff"])
-
-# Phase 1: User Management endpoints (migrated from Next.js)
-app.include_router(users.router, prefix="/api", tags=["users"])
+# Import and register API routers (migrated from Next.js)
+from app.api.endpoints import register_all
 
-# Phase 1: Advanced Trading Orders endpoints (migrated from Next.js)
-app.include_router(advanced_trading.router, prefix="/api", tags=["advanced-trading"])
+register_all(app)
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
@@ -163,5 +217,8 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        # Same event loop and HTTP parser as the container image
+        loop="uvloop",
+        http="httptools"
     )
\ No newline at end of file
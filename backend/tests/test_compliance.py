@@ -0,0 +1,214 @@
+"""
+Unit Tests cho AML screening (compliance endpoints)
+Digital Utopia Platform
+
+Test _screen_one và endpoint batch gọi trực tiếp, không qua HTTP
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+# Add backend to path for imports
+backend_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from app.api.endpoints import compliance
+from app.schemas.compliance import AMLScreeningRequest, AMLBatchScreeningItem
+
+
+def reset_aml_storage():
+    """Xóa dữ liệu AML in-memory giữa các test"""
+    compliance.aml_screenings.clear()
+    compliance.aml_by_user.clear()
+
+
+class TestScreenOne:
+    """Test cases cho _screen_one"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        reset_aml_storage()
+        self.now = datetime(2025, 1, 1, 12, 0, 0)
+
+    def test_clean_name(self):
+        """Test tên không khớp danh sách trừng phạt"""
+        # Execute
+        screening = compliance._screen_one(
+            AMLScreeningRequest(personalInfo={"name": "Alice Nguyen"}), "u1", self.now
+        )
+
+        # Verify
+        assert screening.status == "clean"
+        assert screening.riskLevel == "low"
+        assert screening.findings == []
+        assert screening.lastChecked == self.now.isoformat()
+        assert compliance.aml_by_user["u1"] is screening
+
+    def test_exact_alias_match(self):
+        """Test khớp chính xác theo alias (không phân biệt hoa thường, khoảng trắng)"""
+        # Execute
+        screening = compliance._screen_one(
+            AMLScreeningRequest(personalInfo={"name": "  j.  SMITH "}), "u1", self.now
+        )
+
+        # Verify
+        assert screening.status == "flagged"
+        assert screening.riskLevel == "high"
+        assert screening.findings[0].confidence == 85
+
+    def test_fuzzy_match(self):
+        """Test tên gần đúng được gắn cờ mức medium"""
+        # Execute
+        screening = compliance._screen_one(
+            AMLScreeningRequest(personalInfo={"name": "Jon Smith"}), "u1", self.now
+        )
+
+        # Verify
+        assert screening.status == "flagged"
+        assert screening.riskLevel == "medium"
+        assert screening.findings[0].severity == "medium"
+        assert screening.findings[0].confidence >= compliance.FUZZY_SANCTIONS_CUTOFF
+
+    def test_updates_existing_record(self):
+        """Test sàng lọc lại cập nhật record cũ thay vì tạo mới"""
+        # Setup
+        first = compliance._screen_one(
+            AMLScreeningRequest(personalInfo={"name": "John Smith"}), "u1", self.now
+        )
+
+        # Execute
+        second = compliance._screen_one(
+            AMLScreeningRequest(personalInfo={"name": "Alice Nguyen"}), "u1", self.now
+        )
+
+        # Verify
+        assert second is first
+        assert second.status == "clean"
+        assert len(compliance.aml_screenings) == 1
+
+    def test_missing_name_raises(self):
+        """Test thiếu tên trả về lỗi 400"""
+        # Execute & Verify
+        with pytest.raises(HTTPException) as exc_info:
+            compliance._screen_one(AMLScreeningRequest(personalInfo={}), "u1", self.now)
+        assert exc_info.value.status_code == 400
+        assert "u1" not in compliance.aml_by_user
+
+
+class TestAMLBatchScreening:
+    """Test cases cho perform_aml_screening_batch"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        reset_aml_storage()
+        self.admin = {"uid": "admin-1", "role": "admin"}
+
+    def test_collects_errors_per_item(self):
+        """Test item lỗi được ghi vào errors, các item khác vẫn được xử lý"""
+        # Setup
+        items = [
+            AMLBatchScreeningItem(userId="a", personalInfo={"name": "John Smith"}),
+            AMLBatchScreeningItem(userId="b", personalInfo={}),
+            AMLBatchScreeningItem(userId="c", personalInfo={"name": "Alice Nguyen"}),
+        ]
+
+        # Execute
+        result = asyncio.run(compliance.perform_aml_screening_batch(items, self.admin))
+
+        # Verify
+        assert result["success"] is False
+        assert [r["userId"] for r in result["data"]["results"]] == ["a", "c"]
+        assert [r["status"] for r in result["data"]["results"]] == ["flagged", "clean"]
+        assert result["data"]["errors"] == [{
+            "index": 1,
+            "userId": "b",
+            "detail": "Personal information with name is required for AML screening"
+        }]
+        # Cả batch dùng chung một timestamp
+        assert {r["lastChecked"] for r in result["data"]["results"]} == {result["timestamp"]}
+
+    def test_all_items_succeed(self):
+        """Test batch không có lỗi"""
+        # Setup
+        items = [AMLBatchScreeningItem(userId="a", personalInfo={"name": "Alice Nguyen"})]
+
+        # Execute
+        result = asyncio.run(compliance.perform_aml_screening_batch(items, self.admin))
+
+        # Verify
+        assert result["success"] is True
+        assert result["data"]["errors"] == []
+
+
+class TestAMLEndpointsHTTP:
+    """Test cases cho AML endpoints qua HTTP (TestClient + Bearer token)"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        reset_aml_storage()
+        app = FastAPI()
+        app.include_router(compliance.router)
+        self.client = TestClient(app)
+        self.headers = {"Authorization": "Bearer test-token"}
+
+    def test_screening_uses_authenticated_uid(self):
+        """Test POST /aml nhận body phẳng và lưu kết quả theo uid của token"""
+        # Execute
+        response = self.client.post(
+            "/aml", json={"personalInfo": {"name": "Alice Nguyen"}}, headers=self.headers
+        )
+
+        # Verify
+        assert response.status_code == 200
+        assert response.json()["data"]["userId"] == "mock_user"
+        assert "mock_user" in compliance.aml_by_user
+
+    def test_batch_accepts_json_array_for_admin(self):
+        """Test POST /aml/batch nhận JSON array khi token có role admin"""
+        # Setup
+        payload = {"uid": "admin-1", "email": "admin@example.com", "role": "admin"}
+        body = [
+            {"userId": "a", "personalInfo": {"name": "John Smith"}},
+            {"userId": "b", "personalInfo": {}},
+        ]
+
+        # Execute
+        with patch("app.middleware.auth.verify_token", return_value=payload):
+            response = self.client.post("/aml/batch", json=body, headers=self.headers)
+
+        # Verify
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert [r["userId"] for r in data["results"]] == ["a"]
+        assert [e["index"] for e in data["errors"]] == [1]
+
+    def test_batch_requires_admin_role(self):
+        """Test token không có role admin bị từ chối"""
+        # Execute
+        response = self.client.post(
+            "/aml/batch",
+            json=[{"userId": "a", "personalInfo": {"name": "Alice Nguyen"}}],
+            headers=self.headers
+        )
+
+        # Verify
+        assert response.status_code == 403
+        assert compliance.aml_by_user == {}
+
+    def test_batch_requires_token(self):
+        """Test thiếu Bearer token trả về 401"""
+        # Execute
+        response = self.client.post(
+            "/aml/batch", json=[{"userId": "a", "personalInfo": {"name": "Alice Nguyen"}}]
+        )
+
+        # Verify
+        assert response.status_code == 401
@@ -0,0 +1,165 @@
+"""
+Unit Tests cho lazy imports
+Digital Utopia Platform
+
+Kiểm tra các package dùng PEP 562 __getattr__ chỉ import module khi cần.
+Mỗi test chạy trong một process Python riêng để sys.modules của test runner
+không ảnh hưởng kết quả.
+"""
+
+import pytest
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+# Backend directory - chạy subprocess từ đây để import được package `app`
+backend_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINT_MODULES = (
+    "auth",
+    "client",
+    "admin",
+    "financial",
+    "trading",
+    "market",
+    "portfolio",
+    "compliance",
+    "risk_management",
+    "staff_referrals",
+    "users",
+    "advanced_trading",
+)
+
+
+def run_isolated(script: str, env: dict = None):
+    """Chạy script trong process mới và parse dòng JSON cuối cùng của stdout"""
+    output = subprocess.check_output(
+        [sys.executable, "-W", "ignore", "-c", textwrap.dedent(script)],
+        cwd=backend_path,
+        env={**os.environ, **(env or {})},
+    ).decode()
+    return json.loads(output.splitlines()[-1])
+
+
+class TestBarePackageImport:
+    """Test cases cho import package không kèm truy cập thuộc tính"""
+
+    @pytest.mark.parametrize("package", ["app", "app.api", "app.api.endpoints"])
+    def test_bare_import_loads_no_endpoint_module(self, package):
+        """Test import package không kéo theo endpoint module nào"""
+        # Execute
+        loaded = run_isolated(f"""
+            import sys, json
+            before = set(sys.modules)
+            import {package}
+            print(json.dumps(sorted(
+                m for m in set(sys.modules) - before
+                if m.startswith("app.api.endpoints.")
+            )))
+        """)
+
+        # Verify
+        assert loaded == [], f"Endpoint modules eagerly loaded: {loaded}"
+
+    def test_bare_app_import_loads_no_subpackage(self):
+        """Test import app không import api, schemas, middleware"""
+        # Execute
+        loaded = run_isolated("""
+            import sys, json
+            import app
+            print(json.dumps(sorted(m for m in sys.modules if m.startswith("app."))))
+        """)
+
+        # Verify
+        assert loaded == []
+
+
+class TestLazyRouters:
+    """Test cases cho lazy loading trong app.api.endpoints"""
+
+    @pytest.mark.parametrize("module_name", ENDPOINT_MODULES)
+    def test_router_access_loads_only_its_module(self, module_name):
+        """Test truy cập một router chỉ import đúng endpoint module đó"""
+        # Execute
+        loaded = run_isolated(f"""
+            import sys, json
+            before = set(sys.modules)
+            from app.api.endpoints import {module_name}_router
+            print(json.dumps(sorted(
+                m for m in set(sys.modules) - before
+                if m.startswith("app.api.endpoints.")
+            )))
+        """)
+
+        # Verify
+        assert loaded == [f"app.api.endpoints.{module_name}"]
+
+    @pytest.mark.parametrize("flag", ["1", "true", "YES"])
+    def test_eager_import_loads_every_router(self, flag):
+        """Test ENDPOINTS_EAGER_IMPORT import tất cả router khi import package"""
+        # Execute
+        loaded = run_isolated("""
+            import sys, json
+            import app.api.endpoints as endpoints
+            print(json.dumps({
+                "modules": sorted(m for m in sys.modules if m.startswith("app.api.endpoints.")),
+                "cached": sorted(n for n in endpoints.__all__ if n.endswith("_router") and n in vars(endpoints)),
+            }))
+        """, env={"ENDPOINTS_EAGER_IMPORT": flag})
+
+        # Verify
+        assert loaded["modules"] == sorted(f"app.api.endpoints.{m}" for m in ENDPOINT_MODULES)
+        assert loaded["cached"] == sorted(f"{m}_router" for m in ENDPOINT_MODULES)
+
+    def test_eager_import_disabled_by_zero(self):
+        """Test ENDPOINTS_EAGER_IMPORT=0 vẫn giữ lazy loading"""
+        # Execute
+        loaded = run_isolated("""
+            import sys, json
+            import app.api.endpoints
+            print(json.dumps([m for m in sys.modules if m.startswith("app.api.endpoints.")]))
+        """, env={"ENDPOINTS_EAGER_IMPORT": "0"})
+
+        # Verify
+        assert loaded == []
+
+    def test_submodule_import_defers_execution(self):
+        """Test `from endpoints import admin` chỉ chạy module khi truy cập thuộc tính"""
+        # Execute
+        loaded = run_isolated("""
+            import sys, json
+            import app.api.endpoints as endpoints
+            from app.api.endpoints import admin
+            before_use = "app.schemas.admin" in sys.modules
+            router = admin.router
+            print(json.dumps({
+                "before_use": before_use,
+                "after_use": "app.schemas.admin" in sys.modules,
+                "same_module": admin is sys.modules["app.api.endpoints.admin"],
+                "same_router": router is endpoints.admin_router,
+            }))
+        """)
+
+        # Verify
+        assert loaded == {
+            "before_use": False,
+            "after_use": True,
+            "same_module": True,
+            "same_router": True,
+        }
+
+    def test_unknown_attribute_raises(self):
+        """Test tên không tồn tại vẫn raise AttributeError"""
+        # Execute
+        import app.api.endpoints as endpoints
+
+        # Verify
+        with pytest.raises(AttributeError):
+            endpoints.not_a_router
+
+
+# Run tests
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])